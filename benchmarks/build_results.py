@@ -0,0 +1,135 @@
+"""Rows/sec of result building and diffing: the old per-row loops against the columnar merges.
+
+Run from the repository root: python benchmarks/build_results.py [--rows 500000]
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tt_import.results import RESULT_KEY, build_results, build_results_frame, diff_frames
+
+def synthetic_season(rows, players=20000, competitions=400, seed=0):
+    # A season shaped like the extracted dataset: licence, name, competition, date, points
+    rng = np.random.default_rng(seed)
+    licences = np.array([str(10000 + i) for i in range(players)])
+    comp_names = np.array([f"Synthetic Kupa {i}" for i in range(competitions)])
+    comp_dates = pd.date_range('2025-01-01', periods=competitions, freq='D').strftime('%Y-%m-%d').to_numpy()
+    player_idx = rng.integers(0, players, rows)
+    comp_idx = rng.integers(0, competitions, rows)
+    df = pd.DataFrame({
+        'Rank': rng.integers(1, players, rows),
+        'Licence ID': licences[player_idx],
+        'Name': np.char.add('Player ', licences[player_idx]),
+        'Date': comp_dates[comp_idx],
+        'Competition Name': comp_names[comp_idx],
+        'Points': rng.integers(1, 500, rows),
+    })
+    events = {(n, d): f"event-{i}" for i, (n, d) in enumerate(zip(comp_names, comp_dates))}
+    # Two percent of the players are missing from the database
+    player_map = {lic: f"player-{lic}" for lic in licences[: int(players * 0.98)]}
+    return df, player_map, events
+
+def build_results_rowwise(df, player_map, events):
+    # The per-row loop build_results used before it was vectorized
+    results = []
+    missing_players = set()
+    for name, licence, comp_name, comp_date, points in zip(
+            df['Name'], df['Licence ID'], df['Competition Name'], df['Date'], df['Points']):
+        if pd.isna(comp_date) or not licence or licence == 'nan':
+            continue
+        event_id = events.get((comp_name, comp_date))
+        if not event_id:
+            continue
+        player_id = player_map.get(licence)
+        if not player_id:
+            missing_players.add(f"{name} ({licence})")
+            continue
+        results.append({'event_id': event_id, 'player_id': player_id, 'category': 'Egyes',
+                        'points': int(points), 'position': '-'})
+    return results, missing_players
+
+def diff_results_rowwise(parsed, existing):
+    # The dict-based diff used before diff_frames
+    key = lambda r: tuple(r[k] for k in RESULT_KEY)
+    existing_by_key = {key(r): r for r in existing}
+    parsed_by_key = {key(r): r for r in parsed}
+    inserts, updates, unchanged = [], [], 0
+    for k, row in parsed_by_key.items():
+        current = existing_by_key.get(k)
+        if current is None:
+            inserts.append(row)
+        elif current['points'] != row['points']:
+            updates.append({**current, 'points': row['points']})
+        else:
+            unchanged += 1
+    deletes = [r['id'] for k, r in existing_by_key.items() if k not in parsed_by_key and r['category'] == 'Egyes']
+    return inserts, updates, deletes, unchanged
+
+def stored_results(parsed, seed=0):
+    # Half of the season is already in the database, one percent of it with other points
+    rng = np.random.default_rng(seed)
+    stored = []
+    for i, row in enumerate(parsed[::2]):
+        points = row['points'] + 1 if rng.random() < 0.01 else row['points']
+        stored.append({'id': f"result-{i}", **row, 'points': points})
+    return stored
+
+def iterrows_baseline(df, player_map, events):
+    # The original importers walked the frame with iterrows
+    results = []
+    for _, row in df.iterrows():
+        event_id = events.get((row['Competition Name'], row['Date']))
+        player_id = player_map.get(row['Licence ID'])
+        if event_id and player_id:
+            results.append({'event_id': event_id, 'player_id': player_id, 'category': 'Egyes',
+                            'points': int(row['Points']), 'position': '-'})
+    return results
+
+def measure(label, fn, rows, repeat):
+    best = min(timed(fn) for _ in range(repeat))
+    print(f"{label:<28} {best:8.3f}s {rows / best:14,.0f} rows/s")
+    return best
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=500_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--iterrows-rows', type=int, default=50_000, help="iterrows is timed on a slice this long (default: 50000)")
+    args = parser.parse_args()
+
+    df, player_map, events = synthetic_season(args.rows)
+    print(f"Synthetic season: {len(df)} rows, {len(player_map)} players, {len(events)} events")
+
+    head = df.head(args.iterrows_rows)
+    measure(f"iterrows ({len(head)} rows)", lambda: iterrows_baseline(head, player_map, events), len(head), 1)
+    before = measure("row loop (before)", lambda: build_results_rowwise(df, player_map, events), len(df), args.repeat)
+    frame = measure("merge -> frame (after)", lambda: build_results_frame(df, player_map, events), len(df), args.repeat)
+    measure("merge -> records (after)", lambda: build_results(df, player_map, events), len(df), args.repeat)
+    print(f"Speed-up of the columnar frame over the row loop: {before / frame:.1f}x")
+
+    parsed_rows, _ = build_results(df, player_map, events)
+    parsed_frame, _ = build_results_frame(df, player_map, events)
+    existing = stored_results(parsed_rows)
+    before = measure("dict diff (before)", lambda: diff_results_rowwise(parsed_rows, existing), len(df), args.repeat)
+    after = measure("merge diff (after)", lambda: diff_frames(parsed_frame, existing), len(df), args.repeat)
+    print(f"Speed-up of the merge diff over the dict diff: {before / after:.1f}x")
+    old_diff = diff_results_rowwise(parsed_rows, existing)
+    new_diff = diff_frames(parsed_frame, existing)
+    assert [len(x) for x in old_diff[:3]] + [old_diff[3]] == [len(x) for x in new_diff[:3]] + [new_diff.unchanged], \
+        "merge diff counts differ from the dict diff"
+
+    expected, expected_missing = build_results_rowwise(df, player_map, events)
+    actual, actual_missing = build_results(df, player_map, events)
+    assert actual == expected and actual_missing == expected_missing, "vectorized results differ from the row loop"
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,400 @@
+"""Synthetic national-scale season: players, events, results and ranking list PDFs.
+
+Run from the repository root:
+
+    python benchmarks/generate_season.py [--players 20000] [--events 60] [--output-dir input/synthetic]
+
+Writes, under the output directory:
+  players, events, results and point_table as CSV (and Parquet with
+  --parquet), with the database column names, ready for COPY ... CSV HEADER;
+  <cat><F|N>.csv ranking lists and <cat><F|N>.pdf ranking-style PDFs laid
+  out like the MOATSZ exports, so extract_detailed_points.py --input-dir can
+  read them; with --dataset, the detailed_points dataset the importers read,
+  skipping the extraction.
+
+Result points come from the generated point table, and every ranking list
+total follows the app's rules, so verify_extraction.py passes on the output.
+"""
+import argparse
+import csv
+import os
+import sys
+import uuid
+import zlib
+from collections import defaultdict
+from datetime import date, timedelta
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import detailed_points
+import ranking_lists
+from tt_import.events import RANKING_RULES, event_age_category, validity_date_for
+
+OUTPUT_DIR = "input/synthetic"
+SEASON = 2025
+
+# utils/constants.ts ALLOWED_POSITIONS, and what share of the winner's
+# points each position earns
+POSITION_FACTORS = {
+    '1': 1.0, '2': 0.7, '3': 0.5, '4': 0.45, '5': 0.35, '6': 0.33, '7': 0.3, '8': 0.28,
+    '9': 0.2, '10': 0.19, '11': 0.18, '12': 0.17, '17': 0.12, '33': 0.07, '65': 0.035,
+    'CS3': 0.5, 'CS4': 0.45, 'CS5': 0.35, '17KV': 0.1, '33KV': 0.06, '65KV': 0.03,
+}
+# Event types of the admin event form plus the importer's, with the winner's points
+EVENT_TYPES = {'OB': 2000, 'TOP': 1800, 'I. osztály': 1500, 'Ranglista': 1000, 'II. osztály': 600, 'Megye': 300}
+EVENT_TYPE_WEIGHTS = {'OB': 0.05, 'TOP': 0.1, 'I. osztály': 0.3, 'Ranglista': 0.1, 'II. osztály': 0.3, 'Megye': 0.15}
+PAROS_FACTOR = 0.5
+# Ranking list categories, youngest first, and the oldest age in each
+AGE_CATEGORIES = {'U11': 11, 'U13': 13, 'U15': 15, 'U17': 17, 'U19': 19, 'Felnőtt': 75}
+# Ranking list file suffix: F for men (férfi), N for women (nő)
+GENDERS = {'Male': 'F', 'Female': 'N'}
+
+SURNAMES = [
+    'Kovács', 'Szabó', 'Tóth', 'Nagy', 'Horváth', 'Varga', 'Kiss', 'Molnár', 'Németh', 'Farkas', 'Balogh',
+    'Papp', 'Takács', 'Juhász', 'Mészáros', 'Oláh', 'Simon', 'Rácz', 'Fekete', 'Szilágyi', 'Török', 'Fehér',
+    'Balázs', 'Gál', 'Szűcs', 'Kocsis', 'Pintér', 'Fodor', 'Szalai', 'Sipos', 'Magyar', 'Lukács', 'Gulyás',
+    'Bíró', 'Király', 'Katona', 'László', 'Jakab', 'Sándor', 'Boros', 'Fazekas', 'Kelemen', 'Antal', 'Orosz',
+    'Somogyi', 'Fülöp', 'Veres', 'Vincze', 'Hegedűs', 'Deák', 'Bálint', 'Illés', 'Vass', 'Szőke', 'Fábián',
+    'Vörös', 'Lengyel', 'Halmai', 'Őri', 'Erdős',
+]
+GIVEN_NAMES = {
+    'Male': ['Bence', 'Máté', 'Levente', 'Dominik', 'Marcell', 'Ádám', 'Dániel', 'Balázs', 'Zsombor', 'Péter',
+             'Gergő', 'Botond', 'Milán', 'Olivér', 'Csongor', 'Dávid', 'Áron', 'Benedek', 'Tamás', 'László',
+             'Gábor', 'Attila', 'Zoltán', 'Ferenc', 'Krisztián', 'Norbert', 'Ákos', 'Bálint', 'Előd', 'Nimród'],
+    'Female': ['Hanna', 'Anna', 'Zoé', 'Léna', 'Luca', 'Emma', 'Boglárka', 'Lili', 'Zsófia', 'Jázmin', 'Lilla',
+               'Gréta', 'Réka', 'Nóra', 'Dorina', 'Fanni', 'Eszter', 'Petra', 'Kitti', 'Vivien', 'Csenge',
+               'Dóra', 'Rebeka', 'Bianka', 'Viktória', 'Orsolya', 'Krisztina', 'Enikő', 'Tünde', 'Ildikó'],
+}
+TOWNS = [
+    'Budapest', 'Debrecen', 'Szeged', 'Miskolc', 'Pécs', 'Győr', 'Nyíregyháza', 'Kecskemét', 'Székesfehérvár',
+    'Szombathely', 'Szolnok', 'Érd', 'Tatabánya', 'Kaposvár', 'Sopron', 'Veszprém', 'Békéscsaba',
+    'Zalaegerszeg', 'Eger', 'Nagykanizsa', 'Dunakeszi', 'Hódmezővásárhely', 'Cegléd', 'Mohács', 'Gödöllő',
+    'Baja', 'Vác', 'Salgótarján', 'Szekszárd', 'Pápa',
+]
+CLUB_SUFFIXES = ['Sport Egyesület', 'Asztalitenisz Club', 'Torna Egylet', 'SE', 'ASE', 'Vasutas SC', 'Diák Sport Egyesület']
+COUNTIES = [
+    'Pest', 'Bács-Kiskun', 'Békés', 'Baranya', 'Borsod-Abaúj-Zemplén', 'Csongrád-Csanád', 'Fejér',
+    'Győr-Moson-Sopron', 'Hajdú-Bihar', 'Heves', 'Jász-Nagykun-Szolnok', 'Komárom-Esztergom', 'Nógrád',
+    'Somogy', 'Szabolcs-Szatmár-Bereg', 'Tolna', 'Vas', 'Veszprém', 'Zala',
+]
+
+def point_table():
+    rows = []
+    for event_type, base in EVENT_TYPES.items():
+        for category, factor in (('Egyes', 1.0), ('Páros', PAROS_FACTOR)):
+            for position, share in POSITION_FACTORS.items():
+                rows.append({'event_type': event_type, 'category': category, 'position': position,
+                             'points': int(round(base * factor * share))})
+    return pd.DataFrame(rows)
+
+def home_category(age):
+    return next(cat for cat, oldest in AGE_CATEGORIES.items() if age <= oldest)
+
+def age_group(age):
+    # The Korcsoport column: U<age> for juniors, V40/V50/... for veterans,
+    # empty for adults in between
+    if age <= 21:
+        return f"U{age}"
+    if age >= 40:
+        return f"V{min(age // 10 * 10, 70)}"
+    return ''
+
+def uuids(rng, n):
+    return [str(uuid.UUID(int=int(hi) << 64 | int(lo), version=4))
+            for hi, lo in rng.integers(0, 2**63, size=(n, 2), dtype=np.int64)]
+
+def generate_players(rng, n, season=SEASON):
+    # Ages skew young like the ranking lists: most players are juniors
+    ages = np.where(rng.random(n) < 0.7, rng.integers(8, 20, n), rng.integers(20, 76, n))
+    birth_dates = [date(season - int(age), 1, 1) + timedelta(days=int(d)) for age, d in zip(ages, rng.integers(0, 365, n))]
+    genders = rng.choice(list(GENDERS), n, p=[0.6, 0.4])
+    clubs = [f"{t} {s}" for t in TOWNS for s in CLUB_SUFFIXES]
+    names = [f"{SURNAMES[s]} {GIVEN_NAMES[g][f % len(GIVEN_NAMES[g])]}"
+             for s, g, f in zip(rng.integers(0, len(SURNAMES), n), genders, rng.integers(0, 1000, n))]
+    return pd.DataFrame({
+        'id': uuids(rng, n),
+        'license_id': [str(100000 + i) for i in range(n)],
+        'name': names,
+        'gender': genders,
+        'club': rng.choice(clubs, n),
+        'birth_date': [d.isoformat() for d in birth_dates],
+        'age': ages,
+        'home_category': [home_category(a) for a in ages],
+    })
+
+def event_name(rng, event_type, cat, i):
+    town = TOWNS[rng.integers(len(TOWNS))]
+    if event_type == 'OB':
+        return f"{cat} Országos Bajnokság {i}"
+    if event_type == 'TOP':
+        return f"{cat} TOP 12 verseny {i}"
+    if event_type == 'I. osztály':
+        return f"{town} Kupa {i}, I. osztályú {cat} ranglista verseny"
+    if event_type == 'II. osztály':
+        return f"{town} Kupa {i}, II. osztályú {cat} ranglista verseny"
+    if event_type == 'Megye':
+        return f"{COUNTIES[rng.integers(len(COUNTIES))]} vármegyei bajnokság {i}"
+    return f"{town} nyílt ranglista verseny {i}"
+
+def generate_events(rng, per_category, season=SEASON):
+    types = list(EVENT_TYPE_WEIGHTS)
+    rows = []
+    for cat in AGE_CATEGORIES:
+        for i, event_type in enumerate(rng.choice(types, per_category, p=list(EVENT_TYPE_WEIGHTS.values())), 1):
+            day = date(season, 1, 1) + timedelta(days=int(rng.integers(0, 365)))
+            rows.append({
+                'name': event_name(rng, event_type, cat, i),
+                'type': event_type,
+                'date': day.isoformat(),
+                'validity_date': validity_date_for(day.isoformat()),
+                'age_category': event_age_category(cat),
+                'gender': 'Both',
+                'has_egyes': True,
+                'has_paros': bool(rng.random() < 0.5),
+                'has_vegyes': False,
+                'has_csapat': False,
+                'ranking_category': cat,
+            })
+    events = pd.DataFrame(rows)
+    events.insert(0, 'id', uuids(rng, len(events)))
+    return events
+
+def placements(rng, n):
+    # Finishing positions of an n-player draw: 1-12, then the 17/33/65 brackets
+    positions = []
+    for place in range(1, n + 1):
+        if place <= 12:
+            positions.append(str(place))
+            continue
+        bracket = '17' if place <= 32 else '33' if place <= 64 else '65'
+        positions.append(bracket + 'KV' if rng.random() < 0.3 else bracket)
+    return positions
+
+def generate_results(rng, players, events, min_draw=16, max_draw=128):
+    # Each event draws from the players of its age group, plus the younger
+    # players playing up
+    points = {(r.event_type, r.category, r.position): r.points for r in point_table().itertuples()}
+    cats = list(AGE_CATEGORIES)
+    home = players['home_category'].to_numpy()
+    pools = {}
+    for i, cat in enumerate(cats):
+        playing_up = (home == cats[i - 1]) & (rng.random(len(players)) < 0.3) if i else False
+        pools[cat] = np.flatnonzero((home == cat) | playing_up)
+
+    columns = defaultdict(list)
+    player_ids = players['id'].to_numpy()
+    for event in events.itertuples():
+        pool = pools[event.ranking_category]
+        if not len(pool):
+            continue
+        size = min(len(pool), int(rng.integers(min_draw, max_draw + 1)))
+        entrants = rng.choice(pool, size, replace=False)
+        draws = [('Egyes', entrants)]
+        if event.has_paros:
+            # Pairs share a position
+            pairs = entrants[: size // 2 * 2]
+            draws.append(('Páros', pairs))
+        for category, draw in draws:
+            step = 2 if category == 'Páros' else 1
+            for j, position in enumerate(placements(rng, len(draw) // step)):
+                for k in draw[j * step:(j + 1) * step]:
+                    columns['event_id'].append(event.id)
+                    columns['player_id'].append(player_ids[k])
+                    columns['category'].append(category)
+                    columns['position'].append(position)
+                    columns['points'].append(points[(event.type, category, position)])
+    results = pd.DataFrame(columns)
+    results.insert(0, 'id', uuids(rng, len(results)))
+    return results
+
+def ranking_lists_for(players, events, results):
+    # {(cat, F|N): (ranking frame, detailed rows frame)} under the app's
+    # rules: points per event summed over categories, then the best
+    # RANKING_RULES['max_events'] events within the type limits
+    per_event = results.groupby(['player_id', 'event_id'], as_index=False)['points'].sum()
+    per_event = per_event.merge(events[['id', 'name', 'type', 'date', 'ranking_category']],
+                                left_on='event_id', right_on='id').drop(columns='id')
+    per_event = per_event.merge(players[['id', 'license_id', 'name', 'gender', 'club', 'age']].rename(
+        columns={'name': 'player_name'}), left_on='player_id', right_on='id').drop(columns='id')
+    per_event = per_event.sort_values(['player_id', 'points', 'date'], ascending=[True, False, False], kind='stable')
+
+    lists = {}
+    for (cat, gender), group in per_event.groupby(['ranking_category', 'gender'], sort=False):
+        by_player = group.groupby('player_id', sort=False)
+        eligible = pd.Series(True, index=group.index)
+        for event_type, limit in RANKING_RULES['type_limits'].items():
+            is_type = group['type'] == event_type
+            eligible &= ~is_type | (is_type.astype(int).groupby(group['player_id']).cumsum() <= limit)
+        counted = eligible & (eligible.astype(int).groupby(group['player_id']).cumsum() <= RANKING_RULES['max_events'])
+        ranking = by_player.first()[['license_id', 'player_name', 'club', 'age']]
+        ranking['total'] = group['points'].where(counted, 0).groupby(group['player_id']).sum()
+        ranking = ranking.sort_values(['total', 'license_id'], ascending=[False, True]).reset_index()
+        ranking['rank'] = np.arange(1, len(ranking) + 1)
+
+        # The PDF lists every tournament of a player, newest first
+        detail = group.merge(ranking[['player_id', 'rank']], on='player_id')
+        detail = detail.sort_values(['rank', 'date'], ascending=[True, False], kind='stable')
+        lists[(cat, GENDERS[gender])] = (ranking, detail)
+    return lists
+
+def write_ranking_csv(path, ranking, elos):
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f, delimiter=';')
+        writer.writerow([ranking_lists.RANK, 'ITTF - ETTU', ranking_lists.POINTS, 'Élő-pont',
+                         ranking_lists.LICENCE, ranking_lists.AGE_GROUP, ranking_lists.NAME, ranking_lists.CLUB])
+        for row, elo in zip(ranking.itertuples(), elos):
+            writer.writerow([row.rank, '', row.total, elo, row.license_id, age_group(row.age), row.player_name, row.club])
+
+# --- Ranking-style PDFs ---
+#
+# A minimal PDF writer: Courier, so every glyph is 0.6 em wide and the text
+# layer lines up with the column layout the extractor learns, and
+# WinAnsiEncoding with the four Hungarian double-acute letters mapped onto
+# codes WinAnsi leaves unused.
+
+PAGE_WIDTH = 1312
+PAGE_HEIGHT = 1800
+LINE_HEIGHT = 22
+TOP_MARGIN = 60
+DOUBLE_ACUTE = {'Ő': 0x81, 'ő': 0x8D, 'Ű': 0x8F, 'ű': 0x90}
+DIFFERENCES = '[129 /Ohungarumlaut 141 /ohungarumlaut 143 /Uhungarumlaut 144 /uhungarumlaut]'
+PDF_ENCODE = str.maketrans({c: chr(code) for c, code in DOUBLE_ACUTE.items()})
+# x of each column, as in the exports; tournament lines start under the name
+HEADER = [(76, 'Helyezés'), (195, 'ranglistapont'), (310, 'Élő-pont'), (401, 'Engedély'), (484, 'Korcsoport'),
+          (642, 'Név'), (899, 'Egyesület')]
+PLAYER_COLUMNS = [102, 224, 324, 410, 511, 642, 899]
+TOURNAMENT_X = 638
+FONT_SIZE = 14
+TOURNAMENT_FONT_SIZE = 11
+
+def pdf_text(text):
+    raw = text.translate(PDF_ENCODE).encode('latin-1')
+    return raw.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+def ranking_pdf_lines(ranking, detail, elos, title):
+    # (font size, [(x, text)]) per line, top to bottom
+    yield 30, [(209, 'RANGLISTA')]
+    yield FONT_SIZE, [(87, f"{title}: Összesen {len(ranking)} elemből.")]
+    yield FONT_SIZE, HEADER
+    tournaments = defaultdict(list)
+    for row in detail.itertuples():
+        tournaments[row.player_id].append(row)
+    for row, elo in zip(ranking.itertuples(), elos):
+        yield FONT_SIZE, list(zip(PLAYER_COLUMNS, [str(row.rank), str(row.total), str(elo), row.license_id,
+                                                   age_group(row.age), row.player_name, row.club]))
+        for t in tournaments[row.player_id]:
+            yield TOURNAMENT_FONT_SIZE, [(TOURNAMENT_X, f"{t.date} -- {t.name} {t.points} pont")]
+
+def paginate(lines):
+    pages, page, top = [], [], TOP_MARGIN
+    for size, items in lines:
+        if top + LINE_HEIGHT > PAGE_HEIGHT - TOP_MARGIN and page:
+            pages.append(page)
+            page, top = [], TOP_MARGIN
+        page.append((top, size, items))
+        top += max(LINE_HEIGHT, size + 8)
+    if page:
+        pages.append(page)
+    return pages
+
+def page_stream(page):
+    ops = [b'BT']
+    for top, size, items in page:
+        # PDF y grows upwards from the baseline
+        y = PAGE_HEIGHT - top - size
+        ops.append(b'/F1 %d Tf' % size)
+        for x, text in items:
+            ops.append(b'1 0 0 1 %d %d Tm (%s) Tj' % (x, y, pdf_text(text)))
+    ops.append(b'ET')
+    return zlib.compress(b'\n'.join(ops))
+
+def write_pdf(path, pages):
+    # Objects: 1 catalog, 2 page tree, 3 font, then a page and its content per page
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [%s] /Count %d >>' % (b' '.join(b'%d 0 R' % (4 + 2 * i) for i in range(len(pages))), len(pages)),
+        (b'<< /Type /Font /Subtype /Type1 /BaseFont /Courier /FirstChar 0 /LastChar 255 /Widths [%s] '
+         b'/Encoding << /Type /Encoding /BaseEncoding /WinAnsiEncoding /Differences %s >> >>'
+         % (b' '.join([b'600'] * 256), DIFFERENCES.encode())),
+    ]
+    for i, page in enumerate(pages):
+        stream = page_stream(page)
+        objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 3 0 R >> >> '
+                       b'/Contents %d 0 R >>' % (PAGE_WIDTH, PAGE_HEIGHT, 5 + 2 * i))
+        objects.append(b'<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream' % (len(stream), stream))
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    with open(path, 'wb') as f:
+        f.write(out)
+
+def detailed_frame(detail):
+    # Same columns as extract_detailed_points.stitch_columns
+    return pd.DataFrame({
+        'Rank': detail['rank'].to_numpy(),
+        'Licence ID': detail['license_id'].to_numpy(),
+        'Name': detail['player_name'].to_numpy(),
+        'Date': detail['date'].to_numpy(),
+        'Competition Name': detail['name'].to_numpy(),
+        'Points': detail['points'].to_numpy(),
+    })
+
+def write_tables(output_dir, tables, parquet):
+    for name, df in tables.items():
+        df.to_csv(os.path.join(output_dir, f"{name}.csv"), index=False)
+        if parquet:
+            df.to_parquet(os.path.join(output_dir, f"{name}.parquet"), index=False)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--players', type=int, default=20000, help="Number of players (default: 20000)")
+    parser.add_argument('--events', type=int, default=60, help="Events per age category (default: 60)")
+    parser.add_argument('--max-draw', type=int, default=128, help="Largest number of entrants per event (default: 128)")
+    parser.add_argument('--season', type=int, default=SEASON, help=f"Season year (default: {SEASON})")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help=f"Where to write everything (default: {OUTPUT_DIR})")
+    parser.add_argument('--parquet', action='store_true', help="Also write the tables as Parquet")
+    parser.add_argument('--no-pdf', action='store_true', help="Skip the ranking list PDFs")
+    parser.add_argument('--dataset', action='store_true', help="Also write the detailed_points dataset the importers read")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    os.makedirs(args.output_dir, exist_ok=True)
+    players = generate_players(rng, args.players, args.season)
+    events = generate_events(rng, args.events, args.season)
+    results = generate_results(rng, players, events, max_draw=args.max_draw)
+    write_tables(args.output_dir, {
+        'players': players.drop(columns=['age', 'home_category']),
+        'events': events.drop(columns='ranking_category'),
+        'results': results,
+        'point_table': point_table(),
+    }, args.parquet)
+    print(f"Wrote {len(players)} players, {len(events)} events and {len(results)} results to {args.output_dir}")
+
+    dataset_dir = os.path.join(args.output_dir, detailed_points.DATASET_DIRNAME)
+    rows = pages = 0
+    for (cat, gender), (ranking, detail) in ranking_lists_for(players, events, results).items():
+        name = f"{cat}{gender}"
+        elos = rng.integers(900, 2300, len(ranking))
+        write_ranking_csv(os.path.join(args.output_dir, f"{name}.csv"), ranking, elos)
+        if not args.no_pdf:
+            pdf_pages = paginate(ranking_pdf_lines(ranking, detail, elos, name))
+            write_pdf(os.path.join(args.output_dir, f"{name}.pdf"), pdf_pages)
+            pages += len(pdf_pages)
+        if args.dataset:
+            detailed_points.write_category(detailed_frame(detail), name, dataset_dir)
+        rows += len(detail)
+    print(f"Wrote ranking lists with {rows} tournament rows"
+          + (f" on {pages} PDF pages" if not args.no_pdf else "")
+          + (f" and the dataset under {dataset_dir}" if args.dataset else ""))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,284 @@
+"""Throughput, peak RSS and time to first row of each extraction and import stage.
+
+Run from the repository root:
+
+    python benchmarks/pipeline.py [--season-players 20000] [--rows 500000] [--output bench.json]
+
+Every stage runs in a fresh process, so its peak RSS is its own. The
+extraction stages read the real input/U15/*.pdf files, or with
+--season-players the ranking list PDFs of a season written by
+benchmarks/generate_season.py into a temporary directory (its generation
+is not timed). --scale runs the same PDFs through the tokenizer that many
+times; the files are warm in the OS cache after the first pass, so a
+generated season is the better stand-in for a larger one. The import
+stages read the extracted dataset, or a synthetic season of --rows rows. The COPY write stage needs a scratch Postgres: --db-url or
+TT_BENCH_DB_URL, or a throwaway server from the optional pgserver package.
+It only touches the tt_bench schema created from benchmarks/schema.sql.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import detailed_points
+import ranking_lists
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SCHEMA_PATH = os.path.join(BENCH_DIR, 'schema.sql')
+BENCH_SCHEMA = 'tt_bench'
+# Stages are compared on this metric against --baseline
+THROUGHPUT = ('pages_per_sec', 'rows_per_sec')
+
+def peak_rss():
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+def record(stage, seconds, first=None, pages=None, rows=None):
+    result = {'stage': stage, 'seconds': round(seconds, 4),
+              'first_row_seconds': None if first is None else round(first, 4)}
+    if pages is not None:
+        result['pages'] = pages
+        result['pages_per_sec'] = round(pages / seconds, 1) if seconds else None
+    if rows is not None:
+        result['rows'] = rows
+        result['rows_per_sec'] = round(rows / seconds, 1) if seconds else None
+    return result
+
+# --- Stages; each runs in its own process and returns a list of records ---
+
+def bench_extract(input_dir, categories, scale):
+    from extract_detailed_points import iter_page_tokens, stitch_columns
+    tokenize_seconds = stitch_seconds = 0.0
+    first = None
+    pages = rows = 0
+    for _ in range(scale):
+        for cat in categories:
+            csv_path = os.path.join(input_dir, f"{cat}.csv")
+            licence_to_name = ranking_lists.licence_names(csv_path)
+            start = time.perf_counter()
+            page_tokens = []
+            for tokens in iter_page_tokens(os.path.join(input_dir, f"{cat}.pdf"), ranking_lists.licences(csv_path)):
+                if first is None:
+                    first = tokenize_seconds + time.perf_counter() - start
+                page_tokens.append(tokens)
+            tokenize_seconds += time.perf_counter() - start
+            pages += len(page_tokens)
+
+            start = time.perf_counter()
+            columns = stitch_columns(page_tokens, licence_to_name)
+            stitch_seconds += time.perf_counter() - start
+            rows += len(columns['Rank'])
+    # Both phases share the process, so they share the peak RSS
+    return [record('extract tokenize', tokenize_seconds, first, pages=pages),
+            record('extract stitch', stitch_seconds, rows=rows)]
+
+def import_frames(dataset_dir, categories, rows):
+    # (cat, frame) pairs shaped like tt_import.sources.load_category output
+    if not rows:
+        from tt_import.sources import load_category
+        return [(cat, df) for cat in categories for df in [load_category(cat, 'dataset', dataset_dir)] if df is not None]
+    from build_results import synthetic_season
+    df, _, _ = synthetic_season(rows)
+    return [('U15', df)]
+
+def bench_load(dataset_dir, categories, rows):
+    if rows:
+        # A synthetic season is generated, not loaded
+        return []
+    from tt_import.sources import load_category
+    start = time.perf_counter()
+    first = None
+    total = 0
+    for cat in categories:
+        df = load_category(cat, 'dataset', dataset_dir)
+        if first is None:
+            first = time.perf_counter() - start
+        total += 0 if df is None else len(df)
+    return [record('import load', time.perf_counter() - start, first, rows=total)]
+
+def bench_build_diff(dataset_dir, categories, rows):
+    from build_results import stored_results
+    from tt_import.results import build_results_frame, diff_frames, frame_records
+    df = pd.concat([df for _, df in import_frames(dataset_dir, categories, rows)], ignore_index=True)
+    # Every licence is known and every competition already has an event
+    player_map = {lic: str(uuid.uuid5(uuid.NAMESPACE_OID, lic)) for lic in df['Licence ID'].unique()}
+    events = {k: str(uuid.uuid5(uuid.NAMESPACE_OID, '|'.join(k))) for k in zip(df['Competition Name'], df['Date'])}
+
+    start = time.perf_counter()
+    parsed, _ = build_results_frame(df, player_map, events)
+    build_seconds = time.perf_counter() - start
+
+    existing = stored_results(list(frame_records(parsed)))
+    start = time.perf_counter()
+    diff_frames(parsed, existing)
+    return [record('build results', build_seconds, rows=len(df)),
+            record('diff results', time.perf_counter() - start, rows=len(parsed))]
+
+def bench_copy(dataset_dir, categories, rows, db_url):
+    import psycopg
+    from tt_import.pgcopy import copy_import
+    from tt_import.timing import StageTimer
+    frames = import_frames(dataset_dir, categories, rows)
+    with psycopg.connect(db_url, autocommit=True) as conn:
+        conn.execute(f"TRUNCATE {BENCH_SCHEMA}.results, {BENCH_SCHEMA}.events, {BENCH_SCHEMA}.players")
+        with conn.cursor().copy(f"COPY {BENCH_SCHEMA}.players (name, gender, license_id) FROM STDIN") as copy:
+            licences = pd.concat([df[['Licence ID', 'Name']] for _, df in frames]).drop_duplicates('Licence ID')
+            for licence, name in zip(licences['Licence ID'], licences['Name']):
+                copy.write_row((name, 'N', licence))
+
+    total = sum(len(df) for _, df in frames)
+    records = []
+    # An empty database first, then the same import again, which only
+    # compares and changes nothing
+    for label in ('copy write (new)', 'copy write (rerun)'):
+        timer = StageTimer()
+        start = time.perf_counter()
+        copy_import(db_url, frames, timer=timer)
+        records.append(record(label, time.perf_counter() - start, rows=total))
+        records += [record(f"  {s['stage']}", s['seconds'], rows=s['rows']) for s in timer.stages]
+    return records
+
+def child(conn, fn, args):
+    try:
+        records = fn(*args)
+        rss = peak_rss()
+        conn.send([{**r, 'peak_rss_mb': round(rss / 2**20, 1)} for r in records])
+    except Exception as e:
+        conn.send(e)
+    finally:
+        conn.close()
+
+def run_stage(fn, *args):
+    # spawn, so a stage doesn't inherit the parent's memory or pdfplumber state
+    ctx = multiprocessing.get_context('spawn')
+    parent, conn = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=child, args=(conn, fn, args))
+    process.start()
+    result = parent.recv()
+    process.join()
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+def generate_season(players, output_dir):
+    # Ranking list CSVs and PDFs only; a separate process, like the stages
+    subprocess.run([sys.executable, os.path.join(BENCH_DIR, 'generate_season.py'), '--players', str(players),
+                    '--output-dir', output_dir], check=True, stdout=subprocess.DEVNULL)
+
+# --- Scratch Postgres ---
+
+def with_search_path(db_url):
+    separator = '&' if '?' in db_url else '?'
+    return f"{db_url}{separator}options=-csearch_path%3D{BENCH_SCHEMA}"
+
+def scratch_postgres(db_url):
+    # Returns (url, server); server is kept alive by the caller
+    server = None
+    if not db_url:
+        try:
+            import pgserver
+        except ImportError:
+            return None, None
+        server = pgserver.get_server(tempfile.mkdtemp(prefix='tt_bench_pg_'), cleanup_mode='delete')
+        db_url = server.get_uri()
+    import psycopg
+    with psycopg.connect(db_url, autocommit=True) as conn:
+        with open(SCHEMA_PATH, encoding='utf-8') as f:
+            conn.execute(f.read())
+    return with_search_path(db_url), server
+
+def regressions(results, baseline, tolerance):
+    # Stages whose throughput fell more than tolerance below the baseline
+    before = {r['stage']: r for r in baseline}
+    slower = []
+    for r in results:
+        old = before.get(r['stage'])
+        for metric in THROUGHPUT:
+            if old and r.get(metric) and old.get(metric) and r[metric] < old[metric] * (1 - tolerance):
+                slower.append(f"{r['stage']}: {metric} {r[metric]:,.0f} < {old[metric]:,.0f}")
+    return slower
+
+def describe(r):
+    rate = f"{r['pages_per_sec']:10,.1f} pages/s" if 'pages_per_sec' in r else f"{r.get('rows_per_sec') or 0:10,.0f} rows/s"
+    first = f"  first {r['first_row_seconds']:.3f}s" if r['first_row_seconds'] is not None else ""
+    return f"{r['stage']:<28} {r['seconds']:8.3f}s {rate} {r['peak_rss_mb']:8.1f} MB{first}"
+
+def main():
+    from extract_detailed_points import INPUT_DIR, discover_categories
+    from tt_import.sources import available_categories
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--input-dir', default=INPUT_DIR, help=f"PDFs and ranking list CSVs (default: {INPUT_DIR})")
+    parser.add_argument('--dataset-dir', default=detailed_points.DATASET_DIR, help=f"Extracted dataset (default: {detailed_points.DATASET_DIR})")
+    parser.add_argument('--categories', nargs='*', default=None, help="PDF categories to extract, e.g. U11F (default: all)")
+    parser.add_argument('--season-players', type=int, default=0, help="Extract from a generated season of this many players instead of --input-dir")
+    parser.add_argument('--scale', type=int, default=1, help="Times every PDF is run through the extractor (default: 1)")
+    parser.add_argument('--rows', type=int, default=0, help="Import a synthetic season of this many rows instead of the dataset")
+    parser.add_argument('--skip', nargs='*', default=[], choices=['extract', 'load', 'build', 'copy'], help="Stages to leave out")
+    parser.add_argument('--db-url', default=os.environ.get('TT_BENCH_DB_URL'), help="Scratch Postgres for the COPY stage (default: TT_BENCH_DB_URL, else pgserver)")
+    parser.add_argument('--output', default=None, help="Write the results as JSON to this file")
+    parser.add_argument('--baseline', default=None, help="JSON from an earlier --output run to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed throughput drop against the baseline (default: 0.2)")
+    args = parser.parse_args()
+
+    import_categories = available_categories(args.dataset_dir)
+    results = []
+
+    if 'extract' not in args.skip:
+        input_dir = args.input_dir
+        if args.season_players:
+            input_dir = tempfile.mkdtemp(prefix='tt_bench_season_')
+            print(f"Generating a season of {args.season_players} players in {input_dir}...")
+            generate_season(args.season_players, input_dir)
+        try:
+            pdf_categories = args.categories or discover_categories(input_dir)
+            results += run_stage(bench_extract, input_dir, pdf_categories, args.scale)
+        finally:
+            if args.season_players:
+                shutil.rmtree(input_dir, ignore_errors=True)
+    if 'load' not in args.skip:
+        results += run_stage(bench_load, args.dataset_dir, import_categories, args.rows)
+    if 'build' not in args.skip:
+        results += run_stage(bench_build_diff, args.dataset_dir, import_categories, args.rows)
+    if 'copy' not in args.skip:
+        db_url, server = scratch_postgres(args.db_url)
+        if db_url:
+            try:
+                results += run_stage(bench_copy, args.dataset_dir, import_categories, args.rows, db_url)
+            finally:
+                if server is not None:
+                    server.cleanup()
+        else:
+            print("Skipping the COPY stage: no --db-url or TT_BENCH_DB_URL and pgserver is not installed.")
+
+    print(f"{'stage':<28} {'time':>9} {'throughput':>17} {'peak RSS':>11}")
+    for r in results:
+        print(describe(r))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+        print(f"Wrote {len(results)} stage results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            slower = regressions(results, json.load(f), args.tolerance)
+        for line in slower:
+            print(f"Regression: {line}")
+        sys.exit(1 if slower else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+// Throughput of the pure ranking core (utils/ranking-core.ts) on a synthetic
+// season held in columnar arrays.
+//
+// Run from the repository root (needs the typescript dev dependency):
+//
+//   node benchmarks/ranking_core.js [--results 1000000] [--players 20000] [--events 600] [--repeat 5]
+//                                   [--max-events 6] [--ii-limit 2]
+//
+// Each result is a player's placing in one category of an event, so a player
+// has several results per event, summed before the best events are picked.
+// The generator is seeded, so runs with the same options rank the same data.
+
+require('../scripts/ts-require');
+const { rankResults } = require('../utils/ranking-core.ts');
+
+// Same event types as benchmarks/generate_season.py
+const EVENT_TYPES = ['OB', 'TOP', 'I. osztály', 'Ranglista', 'II. osztály', 'Megye'];
+
+function option(name, fallback) {
+    const index = process.argv.indexOf(`--${name}`);
+    return index > -1 ? parseInt(process.argv[index + 1], 10) : fallback;
+}
+
+// mulberry32
+function random(seed) {
+    return () => {
+        seed = (seed + 0x6D2B79F5) | 0;
+        let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+        t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+        return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+    };
+}
+
+function syntheticColumns(resultCount, playerCount, eventCount, seed) {
+    const rand = random(seed);
+    const eventTypes = Array.from({ length: eventCount }, () => EVENT_TYPES[Math.floor(rand() * EVENT_TYPES.length)]);
+    const columns = {
+        playerIds: new Array(resultCount),
+        eventIds: new Array(resultCount),
+        eventTypes: new Array(resultCount),
+        points: new Int32Array(resultCount),
+    };
+    for (let i = 0; i < resultCount; i++) {
+        // Skewed towards low ids, so some players play far more events than others
+        const player = Math.floor(playerCount * rand() * rand());
+        const event = Math.floor(rand() * eventCount);
+        columns.playerIds[i] = `player-${player}`;
+        columns.eventIds[i] = `event-${event}`;
+        columns.eventTypes[i] = eventTypes[event];
+        columns.points[i] = Math.floor(rand() * 2000);
+    }
+    return columns;
+}
+
+function main() {
+    const resultCount = option('results', 1000000);
+    const playerCount = option('players', 20000);
+    const eventCount = option('events', 600);
+    const repeat = option('repeat', 5);
+    // Defaults are the ranking_rules row the migrations seed
+    const rules = { maxEvents: option('max-events', 6), typeLimits: { 'II. osztály': option('ii-limit', 2) } };
+
+    let start = process.hrtime.bigint();
+    const columns = syntheticColumns(resultCount, playerCount, eventCount, option('seed', 1));
+    console.log(`Generated ${resultCount} results in ${(Number(process.hrtime.bigint() - start) / 1e6).toFixed(0)} ms`);
+    console.log(`Rules: best ${rules.maxEvents} events, limits ${JSON.stringify(rules.typeLimits)}`);
+
+    const timings = [];
+    let ranked = [];
+    for (let run = 0; run < repeat; run++) {
+        start = process.hrtime.bigint();
+        ranked = rankResults(columns, rules);
+        timings.push(Number(process.hrtime.bigint() - start) / 1e6);
+    }
+    timings.sort((a, b) => a - b);
+    const median = timings[Math.floor(timings.length / 2)];
+
+    console.log(`Ranked ${ranked.length} players`);
+    console.log(`rankResults: min ${timings[0].toFixed(0)} ms, median ${median.toFixed(0)} ms over ${repeat} runs`);
+    console.log(`Throughput: ${Math.round(resultCount / (median / 1000)).toLocaleString('en-US')} results/s`);
+    console.log(`Heap used: ${(process.memoryUsage().heapUsed / 2 ** 20).toFixed(0)} MB`);
+}
+
+main();
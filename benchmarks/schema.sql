@@ -0,0 +1,45 @@
+-- Minimal copy of the tables the import writes, for benchmarking against a
+-- throwaway Postgres. Mirrors types/supabase.ts and the migrations.
+DROP SCHEMA IF EXISTS tt_bench CASCADE;
+CREATE SCHEMA tt_bench;
+SET search_path = tt_bench;
+
+CREATE TABLE players (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    name TEXT NOT NULL,
+    gender TEXT NOT NULL,
+    club TEXT,
+    birth_date DATE,
+    license_id TEXT NOT NULL UNIQUE,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE TABLE events (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    date DATE NOT NULL,
+    validity_date DATE NOT NULL,
+    age_category TEXT NOT NULL,
+    gender TEXT,
+    has_egyes BOOLEAN NOT NULL DEFAULT false,
+    has_paros BOOLEAN NOT NULL DEFAULT false,
+    has_vegyes BOOLEAN NOT NULL DEFAULT false,
+    has_csapat BOOLEAN NOT NULL DEFAULT false,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+CREATE INDEX idx_events_name_date ON events(name, date);
+
+CREATE TABLE results (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    event_id UUID NOT NULL REFERENCES events(id) ON DELETE CASCADE,
+    player_id UUID NOT NULL REFERENCES players(id) ON DELETE CASCADE,
+    category TEXT NOT NULL DEFAULT 'Egyes',
+    points INTEGER NOT NULL DEFAULT 0,
+    position TEXT NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    CONSTRAINT results_event_player_category_key UNIQUE (event_id, player_id, category)
+);
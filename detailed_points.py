@@ -0,0 +1,79 @@
+import os
+import unicodedata
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+
+DATASET_DIRNAME = 'detailed_points'
+DATASET_DIR = os.path.join("input/U15", DATASET_DIRNAME)
+
+# Column names match the old <cat>_detailed_points.xlsx sheets so the
+# importers keep working on the same DataFrame layout
+SCHEMA = pa.schema([
+    ('Rank', pa.int32()),
+    ('Licence ID', pa.string()),
+    ('Name', pa.string()),
+    ('Date', pa.date32()),
+    ('Competition Name', pa.string()),
+    ('Points', pa.int32()),
+])
+
+def split_category(cat):
+    # 'U15F' -> ('U15', 'F'), 'FelnőttN' -> ('Felnőtt', 'N')
+    cat = unicodedata.normalize('NFC', cat)
+    return cat[:-1], cat[-1]
+
+def partition_path(cat, dataset_dir=DATASET_DIR):
+    age_category, gender = split_category(cat)
+    return os.path.join(dataset_dir, f"age_category={age_category}", f"gender={gender}", "part-0.parquet")
+
+def to_table(df):
+    df = df.reindex(columns=SCHEMA.names)
+    dates = pd.to_datetime(df['Date'], format='%Y-%m-%d', errors='coerce')
+    return pa.table({
+        'Rank': pa.array(df['Rank'], type=pa.int32()),
+        'Licence ID': pa.array(df['Licence ID'].astype(str), type=pa.string()),
+        'Name': pa.array(df['Name'], type=pa.string()),
+        'Date': pa.array(dates).cast(pa.date32()),
+        'Competition Name': pa.array(df['Competition Name'], type=pa.string()),
+        'Points': pa.array(df['Points'], type=pa.int32()),
+    }, schema=SCHEMA)
+
+def write_category(df, cat, dataset_dir=DATASET_DIR):
+    # Each category owns exactly one file, so rerunning a category replaces it
+    path = partition_path(cat, dataset_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(to_table(df), tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+def has_category(cat, dataset_dir=DATASET_DIR):
+    return os.path.exists(partition_path(cat, dataset_dir))
+
+def read_table(age_category=None, gender=None, dataset_dir=DATASET_DIR):
+    # Memory-mapped reads: column buffers point straight into the page cache
+    dataset = ds.dataset(
+        dataset_dir,
+        format='parquet',
+        partitioning='hive',
+        filesystem=pafs.LocalFileSystem(use_mmap=True),
+    )
+    expr = None
+    if age_category is not None:
+        expr = ds.field('age_category') == unicodedata.normalize('NFC', age_category)
+    if gender is not None:
+        gender_expr = ds.field('gender') == gender
+        expr = gender_expr if expr is None else expr & gender_expr
+    return dataset.to_table(filter=expr)
+
+def read_detailed_points(age_category=None, gender=None, dataset_dir=DATASET_DIR):
+    return read_table(age_category, gender, dataset_dir).to_pandas()
+
+def list_age_categories(dataset_dir=DATASET_DIR):
+    if not os.path.isdir(dataset_dir):
+        return []
+    prefix = 'age_category='
+    return sorted(name[len(prefix):] for name in os.listdir(dataset_dir) if name.startswith(prefix))
@@ -0,0 +1,61 @@
+import argparse
+import datetime
+import sys
+from tt_import.client import load_db_url
+from tt_import.pgcopy import connect
+
+# Runs the day-boundary expiry of player_ranking_state
+# (supabase/migrations/20240901000000_ranking_state_expiry.sql) by hand, e.g.
+# where pg_cron is not available, or against a local Postgres with a fake
+# clock:
+#
+#   python expire_rankings.py --db-url postgresql://localhost/tt --today 2025-03-02
+#   python expire_rankings.py --db-url postgresql://localhost/tt --until 2025-06-30
+
+def parse_date(value):
+    return datetime.date.fromisoformat(value)
+
+def state_as_of(cur):
+    cur.execute("SELECT ranking_state_as_of()")
+    return cur.fetchone()[0]
+
+def expire(cur, today):
+    cur.execute("SELECT * FROM expire_player_ranking_state(%s)", (today,))
+    from_date, to_date, expired_events, refreshed_players = cur.fetchone()
+    print(f"{from_date} -> {to_date}: {expired_events} events expired, {refreshed_players} players refreshed")
+    return refreshed_players
+
+def main():
+    parser = argparse.ArgumentParser(description="Move the ranking state to a new day, refreshing only the players of expired events.")
+    parser.add_argument('--db-url', default=None, help="Postgres connection URL (default: SUPABASE_DB_URL or DATABASE_URL from .env.local)")
+    parser.add_argument('--today', type=parse_date, default=None, help="Day to move the state to, for a fake clock (default: the database's current date)")
+    parser.add_argument('--until', type=parse_date, default=None, help="Step one day at a time from the state's day up to this day, as nightly runs would")
+    args = parser.parse_args()
+
+    db_url = args.db_url or load_db_url()
+    if not db_url:
+        parser.error("needs --db-url or SUPABASE_DB_URL in .env.local")
+    if args.today and args.until:
+        parser.error("--today and --until are exclusive")
+
+    # One transaction per day, so a failed day leaves the earlier ones done
+    with connect(db_url) as conn:
+        with conn.cursor() as cur:
+            if not args.until:
+                cur.execute("SELECT COALESCE(%s, CURRENT_DATE)", (args.today,))
+                expire(cur, cur.fetchone()[0])
+                conn.commit()
+                return
+
+            start = day = state_as_of(cur)
+            if args.until < day:
+                sys.exit(f"The state is already at {day}; use --today to set the clock back.")
+            total = 0
+            while day < args.until:
+                day += datetime.timedelta(days=1)
+                total += expire(cur, day)
+                conn.commit()
+            print(f"{(args.until - start).days} days, {total} player refreshes")
+
+if __name__ == '__main__':
+    main()
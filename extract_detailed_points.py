@@ -1,117 +1,414 @@
 import pdfplumber
 import pandas as pd
+import argparse
+import glob
+import hashlib
+import json
 import re
 import os
+import sys
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pdfplumber.utils import cluster_objects
+import detailed_points
+import ranking_lists
+from tt_import.timing import StageTimer, add_timing_arguments, call_measured, profiled
+
+INPUT_DIR = "input/U15"
+PAGES_PER_TASK = 1
+CACHE_DIRNAME = '.extract_cache'
+
+# Bump whenever tokenize_page output changes so stale cache entries are ignored
+EXTRACTOR_VERSION = 2
+
+# Page tokens produced by phase 1 (workers) and consumed by the stitcher:
+#   (PLAYER, rank, licence_id)
+#   (TOURNAMENT, date_str, comp_name, points)
+PLAYER = 'player'
+TOURNAMENT = 'tournament'
+
+# Column x-boundaries of the ranking table, learned from the header row on
+# the first page and reused for every page of the same PDF
+ColumnLayout = namedtuple('ColumnLayout', ['width', 'rank_x1', 'licence_x0', 'licence_x1'])
+HEADER_LABELS = ('Helyezés', 'Élő-pont', 'Engedély', 'Korcsoport')
+LINE_TOLERANCE = 3
+OUTPUT_COLUMNS = ('Rank', 'Licence ID', 'Name', 'Date', 'Competition Name', 'Points')
+
+# "<date> -- <competition name> <points> pont", split on the first " -- "
+TOURNAMENT_LINE = re.compile(r'^(.*?) -- \s*(.*?)\s+(\d+)\s+pont$')
+
+def parse_tournament_lines(lines):
+    # Match a whole batch of stripped lines with the one compiled pattern;
+    # the result has a token or None for every input line
+    tokens = []
+    for match in map(TOURNAMENT_LINE.match, lines):
+        if match:
+            date_str, comp_name, points = match.groups()
+            tokens.append((TOURNAMENT, date_str.strip(), comp_name.strip().replace("\\", "fi"), int(points)))
+        else:
+            tokens.append(None)
+    return tokens
+
+def learn_layout(page):
+    words = page.extract_words()
+    header = {}
+    for word in words:
+        if word['text'] in HEADER_LABELS:
+            header.setdefault(word['text'], word)
+    if len(header) != len(HEADER_LABELS):
+        return None
+
+    # Header labels are centred over their columns, so split halfway between neighbours
+    rank = header['Helyezés']
+    right_of_rank = [w['x0'] for w in words if abs(w['top'] - rank['top']) < 20 and w['x0'] > rank['x1']]
+    if not right_of_rank:
+        return None
+    return ColumnLayout(
+        width=page.width,
+        rank_x1=(rank['x1'] + min(right_of_rank)) / 2,
+        licence_x0=(header['Élő-pont']['x1'] + header['Engedély']['x0']) / 2,
+        licence_x1=(header['Engedély']['x1'] + header['Korcsoport']['x0']) / 2,
+    )
+
+def tokenize_page_text(page, licences, layout):
+    # Fast path: group the text layer into lines instead of running table detection.
+    # Returns None when the page does not match the learned layout.
+    if abs(page.width - layout.width) > 1:
+        return None
+
+    tokens = []
+    words = page.extract_words()
+    lines = [sorted(line, key=lambda w: w['x0']) for line in cluster_objects(words, lambda w: w['top'], LINE_TOLERANCE)]
+    tournament_tokens = parse_tournament_lines([' '.join(w['text'] for w in line) for line in lines])
+    for line, token in zip(lines, tournament_tokens):
+        if token:
+            tokens.append(token)
+            continue
+
+        first = line[0]
+        if first['text'].isdigit() and first['x1'] <= layout.rank_x1:
+            for word in line[1:]:
+                if word['text'].isdigit() and word['text'] in licences:
+                    if not (layout.licence_x0 <= word['x0'] and word['x1'] <= layout.licence_x1):
+                        return None
+                    tokens.append((PLAYER, int(first['text']), word['text']))
+                    break
+    return tokens
+
+def tokenize_page_tables(page, licences):
+    tokens = []
+    tables = page.extract_tables()
+    for table in tables:
+        for row in table:
+            if not row:
+                continue
+                
+            # Filter out None and empty strings
+            clean_row = [str(c).strip() for c in row if c is not None and str(c).strip() != '']
+            if not clean_row:
+                continue
+            
+            tournament_detected = False
+            for cell in clean_row:
+                if '--' in cell and 'pont' in cell:
+                    tournament_detected = True
+                    lines = [line.strip() for line in cell.split('\n')]
+                    tokens.extend(token for token in parse_tournament_lines(lines) if token)
+                            
+            if not tournament_detected and clean_row[0].isdigit():
+                rank = int(clean_row[0])
+                for cell in clean_row[1:]:
+                    if cell.isdigit() and cell in licences:
+                        tokens.append((PLAYER, rank, cell))
+                        break
+    return tokens
+
+def tokenize_page(page, licences, layout=None):
+    if layout is not None:
+        tokens = tokenize_page_text(page, licences, layout)
+        if tokens is not None:
+            return tokens
+    return tokenize_page_tables(page, licences)
+
+def tokenize_pages(pdf_path, page_numbers, licences, layout=None, text_layer=True):
+    # Phase 1: runs in a worker process, pages are independent of each other
+    # once the column layout of the first page is known
+    with pdfplumber.open(pdf_path) as pdf:
+        if text_layer and layout is None and 0 in page_numbers:
+            layout = learn_layout(pdf.pages[0])
+        return layout, [tokenize_page(pdf.pages[i], licences, layout) for i in page_numbers]
+
+def stitch_columns(page_tokens, licence_to_name):
+    # Phase 2: walk the tokens in page order and resolve which player each
+    # tournament line belongs to, including players spanning a page boundary.
+    # Records are collected column by column rather than as a dict per row.
+    columns = {name: [] for name in OUTPUT_COLUMNS}
+    ranks, licence_ids, names, dates, comp_names, points_column = columns.values()
+
+    def emit(player, date_str, comp_name, points):
+        rank, licence_id, name = player
+        ranks.append(rank)
+        licence_ids.append(licence_id)
+        names.append(name)
+        dates.append(date_str)
+        comp_names.append(comp_name)
+        points_column.append(points)
+
+    current_player = None
+    current_player_has_tournaments = False
+
+    for tokens in page_tokens:
+        for token in tokens:
+            if token[0] == PLAYER:
+                # Emit the PREVIOUS player if they had no tournaments
+                if current_player and not current_player_has_tournaments:
+                    emit(current_player, None, 'No tournaments', 0)
+
+                _, rank, licence_id = token
+                current_player = (rank, licence_id, licence_to_name[licence_id])
+                current_player_has_tournaments = False
+            elif current_player:
+                _, date_str, comp_name, points = token
+                emit(current_player, date_str, comp_name, points)
+                current_player_has_tournaments = True
+
+    # Emit the LAST player if they had no tournaments
+    if current_player and not current_player_has_tournaments:
+        emit(current_player, None, 'No tournaments', 0)
+
+    return columns
+
+def iter_page_tokens(pdf_path, licences, executor=None, pages_per_task=PAGES_PER_TASK, text_layer=True, on_usage=None):
+    # on_usage gets the CPU time and peak RSS each worker task reports
+    with pdfplumber.open(pdf_path) as pdf:
+        page_count = len(pdf.pages)
+    batches = [range(i, min(i + pages_per_task, page_count)) for i in range(0, page_count, pages_per_task)]
+    if not batches:
+        return
+
+    if executor is None:
+        layout = None
+        for batch in batches:
+            layout, tokens = tokenize_pages(pdf_path, batch, licences, layout, text_layer)
+            yield from tokens
+        return
+
+    # The first batch learns the column layout; with the text layer the
+    # remaining pages need it, so they are fanned out once it is known.
+    # Tokens are handed to the stitcher in page order as they complete.
+    first = executor.submit(call_measured, tokenize_pages, pdf_path, batches[0], licences, None, text_layer)
+    layout = first.result()[0][0] if text_layer else None
+    futures = [first] + [executor.submit(call_measured, tokenize_pages, pdf_path, batch, licences, layout, text_layer)
+                         for batch in batches[1:]]
+    for future in futures:
+        (_, tokens), usage = future.result()
+        if on_usage:
+            on_usage(usage)
+        yield from tokens
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+class ExtractionCache:
+    """On-disk cache of page tokens keyed by the PDF, its CSV, the extraction mode and EXTRACTOR_VERSION."""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+
+    def key(self, pdf_path, csv_path, text_layer=True):
+        h = hashlib.sha256()
+        h.update(f"extractor-v{EXTRACTOR_VERSION}\n".encode())
+        # --tables-only must not reuse text-layer tokens, or the comparison is moot
+        h.update(f"text_layer={text_layer}\n".encode())
+        h.update(file_sha256(pdf_path).encode())
+        h.update(file_sha256(csv_path).encode())
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def load(self, key):
+        try:
+            with open(self._path(key), 'rb') as f:
+                data = f.read()
+            page_tokens = [[tuple(token) for token in tokens] for tokens in json.loads(data)]
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            self.bytes_read += len(data)
+        return page_tokens
+
+    def store(self, key, page_tokens):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        data = json.dumps(page_tokens, ensure_ascii=False).encode('utf-8')
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.bytes_written += len(data)
+
+    def summary(self):
+        return (f"Cache: {self.hits} hits, {self.misses} misses, "
+                f"{self.bytes_read} bytes read, {self.bytes_written} bytes written ({self.cache_dir})")
+
+def process_category(cat, input_dir=INPUT_DIR, executor=None, cache=None, export_xlsx=False, text_layer=True, timer=None):
+    pdf_path = os.path.join(input_dir, f"{cat}.pdf")
+    csv_path = os.path.join(input_dir, f"{cat}.csv")
+    dataset_dir = os.path.join(input_dir, detailed_points.DATASET_DIRNAME)
+    output_xlsx = os.path.join(input_dir, f"{cat}_detailed_points.xlsx")
+    timer = timer or StageTimer()
 
-def process_category(cat):
-    pdf_path = f"input/U15/{cat}.pdf"
-    csv_path = f"input/U15/{cat}.csv"
-    output_xlsx = f"input/U15/{cat}_detailed_points.xlsx"
-    
     try:
-        df_base = pd.read_csv(csv_path, sep=';')
-        licence_to_name = dict(zip(df_base['Engedélyszám'].astype(str), df_base['Név']))
+        with timer.stage('read csv', category=cat) as stage:
+            licence_to_name = ranking_lists.licence_names(csv_path)
+            stage['rows'] = len(licence_to_name)
     except Exception as e:
         print(f"[{cat}] Error reading CSV: {e}")
-        return
+        return None
     
-    parsed_data = [] 
-    
-    print(f"[{cat}] Processing PDF...")
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            current_player = None
-            current_player_has_tournaments = False
-            
-            for page_num, page in enumerate(pdf.pages):
-                tables = page.extract_tables()
-                for table in tables:
-                    for row in table:
-                        if not row:
-                            continue
-                            
-                        # Filter out None and empty strings
-                        clean_row = [str(c).strip() for c in row if c is not None and str(c).strip() != '']
-                        if not clean_row:
-                            continue
-                        
-                        tournament_detected = False
-                        for cell in clean_row:
-                            if '--' in cell and 'pont' in cell:
-                                tournament_detected = True
-                                if current_player:
-                                    lines = cell.split('\n')
-                                    for line in lines:
-                                        line = line.strip()
-                                        parts = line.split(' -- ', 1)
-                                        if len(parts) == 2:
-                                            date_str = parts[0].strip()
-                                            rest = parts[1].strip()
-                                            match = re.search(r'^(.*?)\s+(\d+)\s+pont$', rest)
-                                            if match:
-                                                comp_name = match.group(1).strip().replace("\\", "fi")
-                                                points = int(match.group(2))
-                                                parsed_data.append({
-                                                    'Rank': current_player['Rank'],
-                                                    'Licence ID': current_player['Licence ID'],
-                                                    'Name': current_player['Name'],
-                                                    'Date': date_str,
-                                                    'Competition Name': comp_name,
-                                                    'Points': points
-                                                })
-                                                current_player_has_tournaments = True
-                                        
-                        if not tournament_detected and clean_row[0].isdigit():
-                            rank = int(clean_row[0])
-                            licence_id = ""
-                            for cell in clean_row[1:]:
-                                if cell.isdigit() and cell in licence_to_name:
-                                    licence_id = cell
-                                    break
-                                    
-                            if licence_id:
-                                # Process the PREVIOUS player if they had no tournaments
-                                if current_player and not current_player_has_tournaments:
-                                    parsed_data.append({
-                                        'Rank': current_player['Rank'],
-                                        'Licence ID': current_player['Licence ID'],
-                                        'Name': current_player['Name'],
-                                        'Date': None,
-                                        'Competition Name': 'No tournaments',
-                                        'Points': 0
-                                    })
-                                
-                                name = licence_to_name.get(licence_id, clean_row[-2] if len(clean_row)>=2 else "")
-                                current_player = {
-                                    'Rank': rank,
-                                    'Licence ID': licence_id,
-                                    'Name': name
-                                }
-                                current_player_has_tournaments = False
-
-            # Add the LAST player if they had no tournaments
-            if current_player and not current_player_has_tournaments:
-                parsed_data.append({
-                    'Rank': current_player['Rank'],
-                    'Licence ID': current_player['Licence ID'],
-                    'Name': current_player['Name'],
-                    'Date': None,
-                    'Competition Name': 'No tournaments',
-                    'Points': 0
-                })
-
+        cache_key = cache.key(pdf_path, csv_path, text_layer) if cache else None
+        page_tokens = cache.load(cache_key) if cache else None
+        if page_tokens is not None:
+            print(f"[{cat}] PDF unchanged since last run, using cached pages")
+        else:
+            print(f"[{cat}] Processing PDF...")
+            # Pages are collected before stitching, so the PDF parse and the
+            # stitch are timed apart; the stitch is a small share of the time.
+            # Rows are tokens (player and tournament lines), not pages
+            with timer.stage('parse pdf', category=cat) as stage:
+                page_tokens = list(iter_page_tokens(pdf_path, frozenset(licence_to_name), executor, text_layer=text_layer,
+                                                    on_usage=lambda usage: timer.add_worker_usage(stage, usage)))
+                stage['rows'] = sum(len(tokens) for tokens in page_tokens)
+            if cache:
+                cache.store(cache_key, page_tokens)
+        with timer.stage('stitch', category=cat) as stage:
+            parsed_data = stitch_columns(page_tokens, licence_to_name)
+            stage['rows'] = len(parsed_data['Rank'])
     except Exception as e:
         print(f"[{cat}] Error reading PDF: {e}")
-        return
+        return None
+
+    with timer.stage('dataframe', category=cat) as stage:
+        df_detailed = pd.DataFrame(parsed_data)
+        stage['rows'] = len(df_detailed)
+    with timer.stage('write parquet', category=cat) as stage:
+        output_path = detailed_points.write_category(df_detailed, cat, dataset_dir)
+        stage['rows'] = len(df_detailed)
+    print(f"[{cat}] Successfully extracted {len(df_detailed)} detailed records to {output_path}")
+    if export_xlsx:
+        with timer.stage('write xlsx', category=cat) as stage:
+            df_detailed.to_excel(output_xlsx, index=False)
+            stage['rows'] = len(df_detailed)
+        print(f"[{cat}] Exported {output_xlsx}")
+    return len(df_detailed)
+
+def compare_text_layer(cat, input_dir=INPUT_DIR):
+    # Equivalence check: the text-layer fast path must stitch exactly the
+    # same records as the extract_tables path
+    pdf_path = os.path.join(input_dir, f"{cat}.pdf")
+    licence_to_name = ranking_lists.licence_names(os.path.join(input_dir, f"{cat}.csv"))
+    licences = frozenset(licence_to_name)
+
+    fast, tables = [
+        pd.DataFrame(stitch_columns(iter_page_tokens(pdf_path, licences, text_layer=text_layer), licence_to_name))
+        for text_layer in (True, False)
+    ]
+    if fast.equals(tables):
+        print(f"[{cat}] Text layer matches extract_tables ({len(fast)} records)")
+        return True
+
+    print(f"[{cat}] MISMATCH: text layer {len(fast)} records, extract_tables {len(tables)} records")
+    for i, (a, b) in enumerate(zip(fast.to_dict('records'), tables.to_dict('records'))):
+        if a != b:
+            print(f"    first difference at record {i}:\n      text layer:     {a}\n      extract_tables: {b}")
+            break
+    return False
+
+def discover_categories(input_dir=INPUT_DIR):
+    # Every <cat>.pdf that has its <cat>.csv ranking list next to it
+    categories = []
+    for pdf_path in sorted(glob.glob(os.path.join(input_dir, '*.pdf'))):
+        cat = os.path.splitext(os.path.basename(pdf_path))[0]
+        if os.path.exists(os.path.join(input_dir, f"{cat}.csv")):
+            categories.append(cat)
+    return categories
 
-    df_detailed = pd.DataFrame(parsed_data)
-    df_detailed.to_excel(output_xlsx, index=False)
-    print(f"[{cat}] Successfully extracted {len(df_detailed)} detailed records to {output_xlsx}\n")
+def run_categories(categories, input_dir=INPUT_DIR, workers=None, cache=None, export_xlsx=False, text_layer=True, timer=None):
+    if not categories:
+        return {}
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, workers)
+
+    if workers == 1:
+        return {cat: process_category(cat, input_dir, cache=cache, export_xlsx=export_xlsx, text_layer=text_layer, timer=timer) for cat in categories}
+
+    # All pages of all categories share one process pool; a thread per
+    # category only submits its pages and stitches the tokens once they are in.
+    # The biggest PDFs are submitted first so the slowest pages start immediately.
+    by_size = sorted(categories, key=lambda c: os.path.getsize(os.path.join(input_dir, f"{c}.pdf")), reverse=True)
+    with ProcessPoolExecutor(max_workers=workers) as pages_pool, ThreadPoolExecutor(max_workers=len(categories)) as stitchers:
+        futures = {cat: stitchers.submit(process_category, cat, input_dir, pages_pool, cache, export_xlsx, text_layer, timer) for cat in by_size}
+        return {cat: futures[cat].result() for cat in categories}
 
 def main():
-    categories = ['FelnőttN']
+    parser = argparse.ArgumentParser(description="Extract per-tournament ranking points from the ranking list PDFs.")
+    parser.add_argument('categories', nargs='*', help="Categories to extract, e.g. U15F U15N (default: FelnőttN)")
+    parser.add_argument('--all', action='store_true', help="Extract every <cat>.pdf/<cat>.csv pair in the input directory")
+    parser.add_argument('--input-dir', default=INPUT_DIR, help=f"Directory holding the PDFs and CSVs (default: {INPUT_DIR})")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="Number of worker processes (default: CPU count)")
+    parser.add_argument('--cache-dir', default=None, help=f"Page token cache directory (default: <input-dir>/{CACHE_DIRNAME})")
+    parser.add_argument('--no-cache', action='store_true', help="Re-parse every PDF even if it has not changed")
+    parser.add_argument('--xlsx', action='store_true', help="Also export <cat>_detailed_points.xlsx next to the PDF")
+    parser.add_argument('--tables-only', action='store_true', help="Always use pdfplumber table detection instead of the text layer")
+    parser.add_argument('--compare-tables', action='store_true', help="Check that the text layer and extract_tables give identical records, without writing anything")
+    add_timing_arguments(parser)
+    args = parser.parse_args()
+
+    if args.all:
+        categories = discover_categories(args.input_dir)
+    else:
+        categories = args.categories or ['FelnőttN']
+
+    if args.compare_tables:
+        workers = max(1, min(args.workers or os.cpu_count() or 1, len(categories) or 1))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            matches = list(executor.map(compare_text_layer, categories, [args.input_dir] * len(categories)))
+        print(f"--- {sum(matches)}/{len(categories)} categories identical ---")
+        sys.exit(0 if all(matches) else 1)
+
+    cache = None
+    if not args.no_cache:
+        cache = ExtractionCache(args.cache_dir or os.path.join(args.input_dir, CACHE_DIRNAME))
+
+    timer = StageTimer(args.timings)
+    with profiled(args.profile):
+        results = run_categories(categories, args.input_dir, args.workers, cache, args.xlsx, not args.tables_only, timer)
+
+    print("--- Summary ---")
     for cat in categories:
-        process_category(cat)
+        count = results.get(cat)
+        status = f"{count} records" if count is not None else "FAILED"
+        print(f"[{cat}] {status}")
+    if cache:
+        print(cache.summary())
+    print(timer.report())
 
 if __name__ == '__main__':
     main()
@@ -1,49 +1,64 @@
+import argparse
 import os
-from dotenv import load_dotenv
-from supabase import create_client
-import pandas as pd
+from detailed_points import read_detailed_points
+from tt_import.client import create_supabase
+from tt_import.reconcile import load_players, read_licence_info, reconcile, write_candidates
+from tt_import.timing import StageTimer, add_timing_arguments, profiled
 
 def main():
-    load_dotenv('.env.local')
-    url = os.environ.get('NEXT_PUBLIC_SUPABASE_URL')
-    key = os.environ.get('NEXT_PUBLIC_SUPABASE_ANON_KEY')
-    supabase = create_client(url, key)
-
-    f_path = 'input/U15/U15F_detailed_points.xlsx'
-    n_path = 'input/U15/U15N_detailed_points.xlsx'
-    
-    df_f = pd.read_excel(f_path)
-    df_n = pd.read_excel(n_path)
-    df_combined = pd.concat([df_f, df_n], ignore_index=True)
-    
-    players = []
-    page = 0
-    size = 1000
-    while True:
-        res = supabase.table('players').select('license_id').range(page*size, (page+1)*size - 1).execute()
-        players.extend(res.data)
-        if len(res.data) < size:
-            break
-        page += 1
-        
+    parser = argparse.ArgumentParser(description="List ranked players missing from the database and suggest existing players they may be.")
+    parser.add_argument('--category', default='U15', help="Age category to check (default: U15)")
+    parser.add_argument('--input-dir', default='input/U15', help="Directory with the ranking list CSVs (default: input/U15)")
+    parser.add_argument('--candidates', default='input/player_candidates.csv', help="Ranked candidate matches; a .json path writes JSON (default: input/player_candidates.csv)")
+    parser.add_argument('--season', type=int, default=None, help="Season year for the birth-year check (default: year of the latest result)")
+    parser.add_argument('--limit', type=int, default=3, help="Candidates per missing licence (default: 3)")
+    add_timing_arguments(parser)
+    args = parser.parse_args()
+
+    timer = StageTimer(args.timings)
+    with profiled(args.profile):
+        find_missing(args, timer)
+    print(timer.report())
+
+def find_missing(args, timer):
+    supabase = create_supabase()
+
+    with timer.stage('read dataset', category=args.category) as stage:
+        df_combined = read_detailed_points(args.category)
+        stage['rows'] = len(df_combined)
+
+    # One download serves both the licence check and the reconciliation
+    players = timer.timed('load players', rows=len)(load_players)(supabase)
     db_licenses = {str(p['license_id']).strip() for p in players if p.get('license_id')}
-    
-    missing_players = set()
-    for _, row in df_combined.iterrows():
-        player_licence = str(row['Licence ID']).strip()
-        if not player_licence or player_licence == 'nan':
-            continue
-        if player_licence not in db_licenses:
-            missing_players.add(f"{row['Name']} ({player_licence})")
-            
-    output_path = 'input/missing_u15_players.txt'
+
+    licences = df_combined['Licence ID'].astype(str).str.strip()
+    missing_rows = df_combined[(licences != '') & (licences != 'nan') & ~licences.isin(db_licenses)]
+    missing_names = dict(zip(licences[missing_rows.index], missing_rows['Name']))
+    missing_players = set(missing_rows['Name'].astype(str) + ' (' + licences[missing_rows.index] + ')')
+
+    output_path = f"input/missing_{args.category.lower()}_players.txt"
     with open(output_path, 'w', encoding='utf-8') as f:
-        f.write("Missing Players in Supabase DB (U15):\n")
+        f.write(f"Missing Players in Supabase DB ({args.category}):\n")
         f.write("-" * 40 + "\n")
         for p in sorted(missing_players):
             f.write(p + '\n')
-            
+
     print(f"Successfully wrote {len(missing_players)} missing players to {output_path}")
 
+    if not missing_names:
+        return
+    season = args.season or int(df_combined['Date'].max().year)
+    info = read_licence_info(args.input_dir, [args.category])
+    missing = {lic: info.get(lic, {'name': name}) for lic, name in missing_names.items()}
+
+    with timer.stage('reconcile') as stage:
+        rows, unmatched = reconcile(missing, players, season, limit=args.limit)
+        stage['rows'] = len(missing)
+    os.makedirs(os.path.dirname(args.candidates) or '.', exist_ok=True)
+    write_candidates(args.candidates, rows)
+    print(f"Reconciled {len(missing)} missing licences against {len(players)} players in {stage['seconds']:.3f}s: "
+          f"{len(missing) - len(unmatched)} with candidates, {len(unmatched)} without")
+    print(f"Wrote {len(rows)} candidate matches to {args.candidates}")
+
 if __name__ == '__main__':
     main()
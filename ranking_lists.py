@@ -0,0 +1,65 @@
+import functools
+import os
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+# Columns of the ranking list CSVs exported next to each PDF
+RANK = 'Helyezés'
+POINTS = 'MOATSZ ranglistapont'
+LICENCE = 'Engedélyszám'
+NAME = 'Név'
+CLUB = 'Egyesület'
+AGE_GROUP = 'Korcsoport'
+COLUMNS = [RANK, POINTS, LICENCE, NAME, CLUB, AGE_GROUP]
+
+READ_OPTIONS = pacsv.ReadOptions(encoding='utf-8', block_size=1 << 20)
+PARSE_OPTIONS = pacsv.ParseOptions(delimiter=';')
+# Everything is read as text, so licences never turn into floats and the
+# BOM is dropped by the reader
+CONVERT_OPTIONS = pacsv.ConvertOptions(
+    include_columns=COLUMNS,
+    include_missing_columns=True,
+    column_types={c: pa.string() for c in COLUMNS},
+    strings_can_be_null=False,
+)
+
+def read_ranking_list(csv_path):
+    """Rank, points, licence, name, club and age group columns of a ranking list CSV as an Arrow table.
+
+    Parsed once per process: later calls for an unchanged file return the
+    same table.
+    """
+    st = os.stat(csv_path)
+    return _read_ranking_list(os.path.abspath(csv_path), st.st_mtime_ns, st.st_size)
+
+@functools.lru_cache(maxsize=64)
+def _read_ranking_list(csv_path, mtime_ns, size):
+    # Streamed in blocks; only the needed columns are converted
+    reader = pacsv.open_csv(csv_path, read_options=READ_OPTIONS, parse_options=PARSE_OPTIONS,
+                            convert_options=CONVERT_OPTIONS)
+    table = reader.read_all()
+    licences = pc.utf8_trim_whitespace(table.column(LICENCE))
+    return table.set_column(table.schema.get_field_index(LICENCE), LICENCE, licences)
+
+@functools.lru_cache(maxsize=64)
+def _licence_names(csv_path, mtime_ns, size):
+    table = _read_ranking_list(csv_path, mtime_ns, size)
+    return dict(zip(table.column(LICENCE).to_pylist(), table.column(NAME).to_pylist()))
+
+def licence_names(csv_path):
+    # licence -> name; shared between callers, so don't modify it
+    st = os.stat(csv_path)
+    return _licence_names(os.path.abspath(csv_path), st.st_mtime_ns, st.st_size)
+
+def licences(csv_path):
+    return frozenset(licence for licence in licence_names(csv_path) if licence)
+
+def licence_info(csv_path):
+    # licence -> {'name', 'club', 'age_group'}, first row wins
+    table = read_ranking_list(csv_path)
+    info = {}
+    for licence, name, club, age_group in zip(*(table.column(c).to_pylist() for c in (LICENCE, NAME, CLUB, AGE_GROUP))):
+        if licence:
+            info.setdefault(licence, {'name': name, 'club': club, 'age_group': age_group})
+    return info
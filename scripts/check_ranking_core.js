@@ -0,0 +1,124 @@
+// Randomized agreement check between the pure ranking core
+// (utils/ranking-core.ts) and the JavaScript ranking it replaced
+// (scripts/reference-ranking.js). Each case is a small random season with
+// "II. osztály", untyped and other events, repeated point values for ties,
+// several results per player and event, and random limits in place of the
+// best 6 / two "II. osztály" rules.
+//
+// Run from the repository root (needs the typescript dev dependency):
+//
+//   node scripts/check_ranking_core.js [--cases 5000] [--seed 1]
+//
+// Exits with 1 on any difference.
+
+require('./ts-require');
+const { rankResults } = require('../utils/ranking-core.ts');
+const { referenceTotals } = require('./reference-ranking');
+
+const EVENT_TYPES = ['OB', 'TOP', 'I. osztály', 'Ranglista', 'II. osztály', 'II. osztály', 'Megye', null];
+
+function option(name, fallback) {
+    const index = process.argv.indexOf(`--${name}`);
+    return index > -1 ? parseInt(process.argv[index + 1], 10) : fallback;
+}
+
+// mulberry32, as in benchmarks/ranking_core.js
+function random(seed) {
+    return () => {
+        seed = (seed + 0x6D2B79F5) | 0;
+        let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+        t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+        return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+    };
+}
+
+function randomCase(rand) {
+    const int = n => Math.floor(rand() * n);
+    const playerCount = 1 + int(8);
+    const eventCount = 1 + int(15);
+    const eventTypes = Array.from({ length: eventCount }, () => EVENT_TYPES[int(EVENT_TYPES.length)]);
+    // A small range of point values makes ties between events and players common
+    const pointRange = rand() < 0.5 ? 5 : 500;
+
+    const columns = { playerIds: [], eventIds: [], eventTypes: [], points: [] };
+    const playerEvents = new Map();
+    const rowCount = int(60);
+    for (let i = 0; i < rowCount; i++) {
+        const playerId = `player-${int(playerCount)}`;
+        const event = int(eventCount);
+        const points = int(pointRange) * 10;
+        columns.playerIds.push(playerId);
+        columns.eventIds.push(`event-${event}`);
+        columns.eventTypes.push(eventTypes[event]);
+        columns.points.push(points);
+
+        if (!playerEvents.has(playerId)) playerEvents.set(playerId, new Map());
+        const eventGroups = playerEvents.get(playerId);
+        const existing = eventGroups.get(event) || { totalPoints: 0, type: eventTypes[event] };
+        existing.totalPoints += points;
+        eventGroups.set(event, existing);
+    }
+
+    const maxEvents = int(9);
+    const iiOsztalyLimit = int(4);
+    return { columns, playerEvents, maxEvents, iiOsztalyLimit };
+}
+
+// Differences between the core's ranking and the reference totals. The
+// reference keeps players with no counted event at 0 points; the core leaves
+// them out of the ranking.
+function differences({ columns, playerEvents, maxEvents, iiOsztalyLimit }) {
+    const expected = referenceTotals(playerEvents, maxEvents, iiOsztalyLimit);
+    const ranked = rankResults(columns, { maxEvents, typeLimits: { 'II. osztály': iiOsztalyLimit } });
+
+    const problems = [];
+    const seen = new Set();
+    ranked.forEach((row, index) => {
+        seen.add(row.playerId);
+        const want = expected.get(row.playerId);
+        if (!want || want.eventsCount === 0) {
+            problems.push(`unexpected player ${row.playerId}`);
+        } else if (want.totalPoints !== row.totalPoints || want.eventsCount !== row.eventsCount) {
+            problems.push(`player ${row.playerId}: ${row.totalPoints} points / ${row.eventsCount} events, expected ${want.totalPoints} / ${want.eventsCount}`);
+        }
+        if (row.rankPosition !== index + 1) {
+            problems.push(`rank ${row.rankPosition} at position ${index + 1}`);
+        }
+        if (index > 0) {
+            const prev = ranked[index - 1];
+            if (prev.totalPoints < row.totalPoints || (prev.totalPoints === row.totalPoints && prev.playerId > row.playerId)) {
+                problems.push(`not ordered by points and player id at rank ${row.rankPosition}`);
+            }
+        }
+    });
+    expected.forEach((want, playerId) => {
+        if (want.eventsCount > 0 && !seen.has(playerId)) problems.push(`missing player ${playerId}`);
+    });
+    return problems;
+}
+
+function main() {
+    const cases = option('cases', 5000);
+    const seed = option('seed', 1);
+    const rand = random(seed);
+
+    const failures = [];
+    for (let i = 0; i < cases; i++) {
+        const testCase = randomCase(rand);
+        const problems = differences(testCase);
+        if (problems.length > 0) failures.push({ index: i, testCase, problems });
+    }
+
+    if (failures.length === 0) {
+        console.log(`OK: ${cases} random cases agree (seed ${seed})`);
+        return;
+    }
+    console.log(`MISMATCH: ${failures.length} of ${cases} cases differ (seed ${seed}), e.g.`);
+    failures.slice(0, 3).forEach(({ index, testCase, problems }) => {
+        console.log(`  case ${index}: best ${testCase.maxEvents} events, ${testCase.iiOsztalyLimit} "II. osztály"`);
+        problems.slice(0, 5).forEach(p => console.log(`    ${p}`));
+    });
+    process.exit(1);
+}
+
+main();
@@ -0,0 +1,187 @@
+const { createClient } = require('@supabase/supabase-js');
+require('./ts-require');
+const { rankResults } = require('../utils/ranking-core.ts');
+const { referenceTotals } = require('./reference-ranking');
+
+// Compares the get_rankings database function and the pure ranking core in
+// utils/ranking-core.ts with the ranking logic that used to run in
+// utils/ranking.ts and utils/ranking-snapshots.ts (scripts/reference-ranking.js),
+// for every gender and age category. For today's date the trigger-maintained
+// get_current_rankings is checked too. Exits with 1 on any difference.
+//
+//   node scripts/check_rankings.js [--as-of 2025-06-01]
+
+const SUPABASE_URL = process.env.NEXT_PUBLIC_SUPABASE_URL;
+const SUPABASE_KEY = process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY;
+
+if (!SUPABASE_URL || !SUPABASE_KEY) {
+    console.error('Error: NEXT_PUBLIC_SUPABASE_URL and NEXT_PUBLIC_SUPABASE_ANON_KEY must be set.');
+    process.exit(1);
+}
+
+const supabase = createClient(SUPABASE_URL, SUPABASE_KEY);
+
+const GENDERS = ['Male', 'Female'];
+const CATEGORIES = ['Senior', 'U19', 'U15', 'U13', 'U11'];
+const PAGE_SIZE = 1000;
+
+// Runs query(after) with the key of the last row seen until a page comes
+// back empty, so a max-rows setting below PAGE_SIZE cannot cut it short
+async function forEachPage(query, key, onPage) {
+    let after = null;
+    for (;;) {
+        const { data, error } = await query(after);
+        if (error) throw error;
+        if (!data || data.length === 0) return;
+        onPage(data);
+        after = data[data.length - 1][key];
+    }
+}
+
+// The reference ranking; ageLimit is the birth-year filter only the
+// snapshot version applied. Gender and category are filtered by the query
+// and each page is folded into per-player event totals as it arrives, so the
+// raw results are never held all at once. The folded totals are returned too,
+// for the ranking core to rank the same data.
+async function referenceRanking(gender, ageCategory, ageLimit, asOf, rules) {
+    const isUCategory = ageCategory && ageCategory !== 'Senior' && ageCategory.startsWith('U');
+    const maxAllowedAge = isUCategory ? parseInt(ageCategory.replace('U', ''), 10) : null;
+    const currentYear = new Date(asOf).getFullYear();
+
+    const playerEvents = new Map();
+    let resultCount = 0;
+    await forEachPage(after => {
+        let query = supabase
+            .from('results')
+            .select(`
+                id,
+                points,
+                player:players!inner (id, gender, birth_date),
+                event:events!inner (id, type, validity_date, age_category)
+            `)
+            .gte('event.validity_date', asOf)
+            .eq('player.gender', gender)
+            .eq('event.age_category', ageCategory);
+        if (after !== null) query = query.gt('id', after);
+        return query.order('id').limit(PAGE_SIZE);
+    }, 'id', page => {
+        resultCount += page.length;
+        page.forEach(r => {
+            if (ageLimit && isUCategory && maxAllowedAge !== null && r.player.birth_date) {
+                if (currentYear - new Date(r.player.birth_date).getFullYear() > maxAllowedAge) return;
+            }
+            if (!playerEvents.has(r.player.id)) playerEvents.set(r.player.id, new Map());
+            const eventGroups = playerEvents.get(r.player.id);
+            const existing = eventGroups.get(r.event.id) || { totalPoints: 0, type: r.event.type };
+            existing.totalPoints += r.points;
+            eventGroups.set(r.event.id, existing);
+        });
+    });
+    const totals = referenceTotals(playerEvents, rules.maxEvents, rules.typeLimits['II. osztály'] ?? Infinity);
+    return { totals, playerEvents, resultCount };
+}
+
+// utils/ranking-core.ts on the folded totals, as rows shaped like get_rankings
+function coreRanking(playerEvents, rules) {
+    const columns = { playerIds: [], eventIds: [], eventTypes: [], points: [] };
+    playerEvents.forEach((eventGroups, playerId) => {
+        eventGroups.forEach((event, eventId) => {
+            columns.playerIds.push(playerId);
+            columns.eventIds.push(eventId);
+            columns.eventTypes.push(event.type);
+            columns.points.push(event.totalPoints);
+        });
+    });
+    return rankResults(columns, rules).map(r => ({
+        rank_position: r.rankPosition,
+        player_id: r.playerId,
+        total_points: r.totalPoints,
+        events_count: r.eventsCount,
+    }));
+}
+
+function compare(label, expected, rows) {
+    const problems = [];
+    if (rows.length !== expected.size) {
+        problems.push(`${rows.length} ranked players, expected ${expected.size}`);
+    }
+    rows.forEach((row, index) => {
+        const want = expected.get(row.player_id);
+        if (!want) {
+            problems.push(`unexpected player ${row.player_id}`);
+        } else if (want.totalPoints !== row.total_points || want.eventsCount !== row.events_count) {
+            problems.push(`player ${row.player_id}: ${row.total_points} points / ${row.events_count} events, expected ${want.totalPoints} / ${want.eventsCount}`);
+        }
+        if (row.rank_position !== index + 1) {
+            problems.push(`rank ${row.rank_position} at position ${index + 1}`);
+        }
+        if (index > 0 && rows[index - 1].total_points < row.total_points) {
+            problems.push(`not sorted by points at rank ${row.rank_position}`);
+        }
+    });
+
+    if (problems.length === 0) {
+        console.log(`[${label}] OK: ${rows.length} players`);
+        return true;
+    }
+    console.log(`[${label}] MISMATCH: ${problems.length} problems, e.g.`);
+    problems.slice(0, 5).forEach(p => console.log(`    ${p}`));
+    return false;
+}
+
+async function fetchRanking(fn, args) {
+    const rows = [];
+    await forEachPage(after => supabase
+        .rpc(fn, args)
+        .gt('rank_position', after ?? 0)
+        .order('rank_position')
+        .limit(PAGE_SIZE), 'rank_position', page => {
+        rows.push(...page);
+    });
+    return rows;
+}
+
+// The ranking_rules row get_rankings and player_ranking_state rank by
+async function fetchRules() {
+    const { data, error } = await supabase.from('ranking_rules').select('max_events, type_limits').single();
+    if (error) throw error;
+    return { maxEvents: data.max_events, typeLimits: data.type_limits };
+}
+
+async function checkRankings() {
+    const asOfIndex = process.argv.indexOf('--as-of');
+    const today = new Date().toISOString().slice(0, 10);
+    const asOf = asOfIndex > -1 ? process.argv[asOfIndex + 1] : today;
+
+    const rules = await fetchRules();
+    console.log(`Checking rankings valid on ${asOf}: best ${rules.maxEvents} events, limits ${JSON.stringify(rules.typeLimits)}`);
+    // The old ranking only ever limited "II. osztály" events
+    const otherTypes = Object.keys(rules.typeLimits).filter(type => type !== 'II. osztály');
+    if (otherTypes.length > 0) {
+        console.log(`The reference has no limit for ${otherTypes.join(', ')}; those players will differ`);
+    }
+
+    let ok = true;
+    for (const gender of GENDERS) {
+        for (const ageCategory of CATEGORIES) {
+            for (const ageLimit of [false, true]) {
+                const label = `${gender} ${ageCategory}${ageLimit ? ' (age limit)' : ''}`;
+                const { totals, playerEvents, resultCount } = await referenceRanking(gender, ageCategory, ageLimit, asOf, rules);
+                ok = compare(`${label}, ranking-core`, totals, coreRanking(playerEvents, rules)) && ok;
+                const args = { p_gender: gender, p_age_category: ageCategory, p_age_limit: ageLimit };
+                const rows = await fetchRanking('get_rankings', { ...args, p_as_of: asOf });
+                ok = compare(`${label}, ${resultCount} results`, totals, rows) && ok;
+                if (asOf === today) {
+                    const current = await fetchRanking('get_current_rankings', args);
+                    ok = compare(`${label}, player_ranking_state`, totals, current) && ok;
+                }
+            }
+        }
+    }
+    process.exit(ok ? 0 : 1);
+}
+
+checkRankings().catch(err => {
+    console.error('Error checking rankings:', err);
+    process.exit(1);
+});
@@ -0,0 +1,36 @@
+// The JavaScript ranking as it ran in utils/ranking.ts and
+// utils/ranking-snapshots.ts before get_rankings, kept as the reference the
+// database functions and utils/ranking-core.ts are checked against.
+//
+// playerEvents maps a player id to a Map of event id -> { totalPoints, type },
+// the player's points already summed per event. Returns a Map of player id ->
+// { totalPoints, eventsCount }. maxEvents and iiOsztalyLimit were the
+// hard-coded 6 and 2.
+
+function referenceTotals(playerEvents, maxEvents = 6, iiOsztalyLimit = 2) {
+    const totals = new Map();
+    playerEvents.forEach((eventGroups, playerId) => {
+        const sortedEvents = Array.from(eventGroups.values()).sort((a, b) => b.totalPoints - a.totalPoints);
+
+        let totalPoints = 0;
+        let eventsCount = 0;
+        let iiOsztalyCount = 0;
+        for (const event of sortedEvents) {
+            if (eventsCount >= maxEvents) break;
+            if (event.type === 'II. osztály') {
+                if (iiOsztalyCount < iiOsztalyLimit) {
+                    totalPoints += event.totalPoints;
+                    eventsCount++;
+                    iiOsztalyCount++;
+                }
+            } else {
+                totalPoints += event.totalPoints;
+                eventsCount++;
+            }
+        }
+        totals.set(playerId, { totalPoints, eventsCount });
+    });
+    return totals;
+}
+
+module.exports = { referenceTotals };
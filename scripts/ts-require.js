@@ -0,0 +1,14 @@
+const fs = require('fs');
+const ts = require('typescript');
+
+// Lets the node scripts require the pure TypeScript modules under utils/,
+// e.g. require('../utils/ranking-core.ts'), by transpiling them as they are
+// loaded. Uses the typescript dev dependency; no type checking is done.
+
+require.extensions['.ts'] = (module, filename) => {
+    const { outputText } = ts.transpileModule(fs.readFileSync(filename, 'utf8'), {
+        compilerOptions: { module: ts.ModuleKind.CommonJS, target: ts.ScriptTarget.ES2020 },
+        fileName: filename,
+    });
+    module._compile(outputText, filename);
+};
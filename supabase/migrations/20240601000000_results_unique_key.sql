@@ -0,0 +1,22 @@
+-- One result per event, player and category; the importers merge on this key
+-- with INSERT ... ON CONFLICT
+
+-- Drop duplicates left by earlier imports, keeping the most recently written
+-- row by updated_at, then created_at; id breaks the remaining ties
+DELETE FROM results
+WHERE id IN (
+    SELECT id FROM (
+        SELECT id,
+               ROW_NUMBER() OVER (
+                   PARTITION BY event_id, player_id, category
+                   ORDER BY updated_at DESC NULLS LAST, created_at DESC NULLS LAST, id DESC
+               ) AS n
+        FROM results
+    ) ranked
+    WHERE n > 1
+);
+
+ALTER TABLE results ADD CONSTRAINT results_event_player_category_key UNIQUE (event_id, player_id, category);
+
+-- Imports look events up by name and date
+CREATE INDEX IF NOT EXISTS idx_events_name_date ON events(name, date);
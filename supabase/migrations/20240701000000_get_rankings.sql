@@ -0,0 +1,126 @@
+-- Rankings computed in the database: only the final ranked rows leave it
+-- instead of every valid result.
+--
+-- Same rules as the ranking code in utils/:
+--   * results of events still valid on p_as_of, filtered by player gender and
+--     event age_category
+--   * with p_age_limit, a U<n> ranking skips players older than n in the
+--     year of p_as_of; players without a birth date stay in
+--   * points are summed per event across Egyes/Páros/Vegyes/Csapat
+--   * the best ranking_rules.max_events events count, at most
+--     ranking_rules.type_limits[type] of a type (6, and 2 "II. osztály")
+-- Ties in total points are ordered by name, then player id.
+
+-- The one place the ranking rules live; ranked_player_events, and through
+-- it get_rankings and player_ranking_state, reads them from here
+CREATE TABLE IF NOT EXISTS ranking_rules (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    max_events INTEGER NOT NULL,
+    -- {"<event type>": <most events of that type that count>}
+    type_limits JSONB NOT NULL DEFAULT '{}'
+);
+
+INSERT INTO ranking_rules (max_events, type_limits)
+VALUES (6, '{"II. osztály": 2}')
+ON CONFLICT (id) DO NOTHING;
+
+CREATE INDEX IF NOT EXISTS idx_events_validity_age ON events(validity_date, age_category);
+CREATE INDEX IF NOT EXISTS idx_results_player ON results(player_id);
+
+-- Each player's events valid on p_as_of with points summed per event and
+-- whether they count under ranking_rules. Per player across the filtered
+-- categories, or with p_by_category per player and age_category.
+CREATE OR REPLACE FUNCTION ranked_player_events(
+    p_as_of DATE,
+    p_gender TEXT DEFAULT NULL,
+    p_age_category TEXT DEFAULT NULL,
+    p_age_limit BOOLEAN DEFAULT FALSE,
+    p_player_ids UUID[] DEFAULT NULL,
+    p_by_category BOOLEAN DEFAULT FALSE
+)
+RETURNS TABLE (
+    player_id UUID,
+    age_category TEXT,
+    event_id UUID,
+    type TEXT,
+    validity_date DATE,
+    points INTEGER,
+    counted BOOLEAN
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH per_event AS (
+        SELECT r.player_id, CASE WHEN p_by_category THEN e.age_category END AS age_category,
+               r.event_id, e.type, e.validity_date, SUM(r.points)::INTEGER AS points
+        FROM results r
+        JOIN events e ON e.id = r.event_id
+        JOIN players p ON p.id = r.player_id
+        WHERE e.validity_date >= p_as_of
+          AND (p_player_ids IS NULL OR r.player_id = ANY(p_player_ids))
+          AND (p_gender IS NULL OR p.gender = p_gender)
+          AND (p_age_category IS NULL OR e.age_category = p_age_category)
+          AND NOT (p_by_category AND e.age_category IS NULL)
+          AND NOT (
+              p_age_limit
+              AND p_age_category IS NOT NULL
+              AND p_age_category ~ '^U[0-9]+$'
+              AND p.birth_date IS NOT NULL
+              AND EXTRACT(YEAR FROM p_as_of) - EXTRACT(YEAR FROM p.birth_date) > substring(p_age_category FROM 2)::INTEGER
+          )
+        GROUP BY 1, 2, 3, 4, 5
+    ),
+    -- Events best first; one of a limited type is eligible while it is among
+    -- the best type_limits[type] of its type
+    ordered AS (
+        SELECT pe.*, rules.max_events,
+               COALESCE(
+                   ROW_NUMBER() OVER (PARTITION BY pe.player_id, pe.age_category, pe.type ORDER BY pe.points DESC, pe.event_id)
+                       <= (rules.type_limits ->> pe.type)::INTEGER,
+                   TRUE
+               ) AS eligible
+        FROM per_event pe
+        CROSS JOIN ranking_rules rules
+    )
+    SELECT player_id, age_category, event_id, type, validity_date, points,
+           eligible AND ROW_NUMBER() OVER (PARTITION BY player_id, age_category, eligible ORDER BY points DESC, event_id) <= max_events
+    FROM ordered;
+$$;
+
+CREATE OR REPLACE FUNCTION get_rankings(
+    p_gender TEXT DEFAULT NULL,
+    p_age_category TEXT DEFAULT NULL,
+    p_as_of DATE DEFAULT CURRENT_DATE,
+    p_age_limit BOOLEAN DEFAULT FALSE
+)
+RETURNS TABLE (
+    rank_position INTEGER,
+    player_id UUID,
+    player_name TEXT,
+    gender TEXT,
+    club TEXT,
+    club_id UUID,
+    club_name TEXT,
+    birth_date DATE,
+    total_points INTEGER,
+    events_count INTEGER
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH totals AS (
+        SELECT player_id, SUM(points)::INTEGER AS total_points, COUNT(*)::INTEGER AS events_count
+        FROM ranked_player_events(p_as_of, p_gender, p_age_category, p_age_limit)
+        WHERE counted
+        GROUP BY player_id
+    )
+    SELECT ROW_NUMBER() OVER (ORDER BY t.total_points DESC, p.name, p.id)::INTEGER,
+           p.id, p.name, p.gender, p.club, p.club_id, c.name, p.birth_date,
+           t.total_points, t.events_count
+    FROM totals t
+    JOIN players p ON p.id = t.player_id
+    LEFT JOIN clubs c ON c.id = p.club_id
+    ORDER BY 1;
+$$;
+
+COMMENT ON FUNCTION get_rankings(TEXT, TEXT, DATE, BOOLEAN) IS 'Ranked players with their totals under ranking_rules; called by utils/ranking.ts and utils/ranking-snapshots.ts';
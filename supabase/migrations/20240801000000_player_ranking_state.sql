@@ -0,0 +1,211 @@
+-- Rankings kept up to date as results are written, instead of recomputed from
+-- every valid result on each snapshot.
+--
+-- player_ranking_state has one row per player and event age category: the
+-- player's per-event totals (event_points) and the current aggregate, ranked
+-- by ranked_player_events like get_rankings. Triggers on results refresh only the
+-- players a statement touched, so adding a result reads that one player's
+-- results, and a bulk import refreshes all of its players in one pass.
+--
+-- The state counts events valid on as_of, the day of the last refresh;
+-- results of events that expire after that stay counted until the player is
+-- refreshed again.
+
+CREATE TABLE IF NOT EXISTS player_ranking_state (
+    player_id UUID NOT NULL REFERENCES players(id) ON DELETE CASCADE,
+    age_category TEXT NOT NULL,
+    gender TEXT,
+    total_points INTEGER NOT NULL,
+    events_count INTEGER NOT NULL,
+    -- [{event_id, type, validity_date, points, counted}], best first
+    event_points JSONB NOT NULL,
+    as_of DATE NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (player_id, age_category)
+);
+
+-- Standings for one gender and category straight off the index
+CREATE INDEX IF NOT EXISTS idx_ranking_state_standings
+    ON player_ranking_state(gender, age_category, total_points DESC);
+
+-- Triggers on events look up the players of one event
+CREATE INDEX IF NOT EXISTS idx_results_event ON results(event_id);
+
+CREATE OR REPLACE FUNCTION refresh_player_ranking_state(p_player_ids UUID[], p_as_of DATE DEFAULT CURRENT_DATE)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    refreshed INTEGER;
+BEGIN
+    -- Concurrent refreshes of the same player run one after the other;
+    -- NO KEY UPDATE still lets other sessions insert results for them
+    PERFORM 1 FROM players WHERE id = ANY(p_player_ids) ORDER BY id FOR NO KEY UPDATE;
+
+    DELETE FROM player_ranking_state WHERE player_id = ANY(p_player_ids);
+
+    INSERT INTO player_ranking_state (player_id, age_category, gender, total_points, events_count, event_points, as_of)
+    SELECT f.player_id, f.age_category, p.gender,
+           COALESCE(SUM(f.points) FILTER (WHERE f.counted), 0)::INTEGER,
+           COUNT(*) FILTER (WHERE f.counted)::INTEGER,
+           jsonb_agg(jsonb_build_object(
+               'event_id', f.event_id,
+               'type', f.type,
+               'validity_date', f.validity_date,
+               'points', f.points,
+               'counted', f.counted
+           ) ORDER BY f.points DESC, f.event_id),
+           p_as_of
+    FROM ranked_player_events(p_as_of, p_player_ids => p_player_ids, p_by_category => TRUE) f
+    JOIN players p ON p.id = f.player_id
+    GROUP BY f.player_id, f.age_category, p.gender;
+
+    GET DIAGNOSTICS refreshed = ROW_COUNT;
+    RETURN refreshed;
+END;
+$$;
+
+-- Statement-level, so a bulk insert or import refreshes each player once
+CREATE OR REPLACE FUNCTION results_refresh_ranking_state()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM refresh_player_ranking_state(ARRAY(SELECT DISTINCT player_id FROM new_rows));
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM refresh_player_ranking_state(ARRAY(SELECT DISTINCT player_id FROM old_rows));
+    ELSE
+        PERFORM refresh_player_ranking_state(ARRAY(
+            SELECT player_id FROM new_rows UNION SELECT player_id FROM old_rows
+        ));
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS results_ranking_state_insert ON results;
+CREATE TRIGGER results_ranking_state_insert
+    AFTER INSERT ON results
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION results_refresh_ranking_state();
+
+DROP TRIGGER IF EXISTS results_ranking_state_update ON results;
+CREATE TRIGGER results_ranking_state_update
+    AFTER UPDATE ON results
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION results_refresh_ranking_state();
+
+DROP TRIGGER IF EXISTS results_ranking_state_delete ON results;
+CREATE TRIGGER results_ranking_state_delete
+    AFTER DELETE ON results
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION results_refresh_ranking_state();
+
+-- An edited event moves points between categories or changes what counts
+CREATE OR REPLACE FUNCTION events_refresh_ranking_state()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM refresh_player_ranking_state(ARRAY(SELECT DISTINCT player_id FROM results WHERE event_id = NEW.id));
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS events_ranking_state_update ON events;
+CREATE TRIGGER events_ranking_state_update
+    AFTER UPDATE OF type, validity_date, age_category ON events
+    FOR EACH ROW
+    WHEN (OLD.type IS DISTINCT FROM NEW.type
+          OR OLD.validity_date IS DISTINCT FROM NEW.validity_date
+          OR OLD.age_category IS DISTINCT FROM NEW.age_category)
+    EXECUTE FUNCTION events_refresh_ranking_state();
+
+-- New rules change what counts for everyone
+CREATE OR REPLACE FUNCTION ranking_rules_refresh_ranking_state()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM refresh_player_ranking_state(ARRAY(SELECT DISTINCT player_id FROM results));
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS ranking_rules_ranking_state ON ranking_rules;
+CREATE TRIGGER ranking_rules_ranking_state
+    AFTER INSERT OR UPDATE ON ranking_rules
+    FOR EACH STATEMENT EXECUTE FUNCTION ranking_rules_refresh_ranking_state();
+
+CREATE OR REPLACE FUNCTION players_sync_ranking_state_gender()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE player_ranking_state SET gender = NEW.gender, updated_at = NOW() WHERE player_id = NEW.id;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS players_ranking_state_gender ON players;
+CREATE TRIGGER players_ranking_state_gender
+    AFTER UPDATE OF gender ON players
+    FOR EACH ROW
+    WHEN (OLD.gender IS DISTINCT FROM NEW.gender)
+    EXECUTE FUNCTION players_sync_ranking_state_gender();
+
+-- Current standings from player_ranking_state, in the shape of get_rankings.
+-- The age limit needs no recompute: it drops a player from a category as a
+-- whole, so it is applied here. Without a category (the ranking across all
+-- categories, which the state does not hold) it falls back to get_rankings.
+CREATE OR REPLACE FUNCTION get_current_rankings(
+    p_gender TEXT DEFAULT NULL,
+    p_age_category TEXT DEFAULT NULL,
+    p_age_limit BOOLEAN DEFAULT FALSE
+)
+RETURNS TABLE (
+    rank_position INTEGER,
+    player_id UUID,
+    player_name TEXT,
+    gender TEXT,
+    club TEXT,
+    club_id UUID,
+    club_name TEXT,
+    birth_date DATE,
+    total_points INTEGER,
+    events_count INTEGER
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+BEGIN
+    IF p_age_category IS NULL THEN
+        RETURN QUERY SELECT * FROM get_rankings(p_gender, NULL, CURRENT_DATE, p_age_limit);
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+    SELECT ROW_NUMBER() OVER (ORDER BY s.total_points DESC, p.name, p.id)::INTEGER,
+           p.id, p.name, p.gender, p.club, p.club_id, c.name, p.birth_date,
+           s.total_points, s.events_count
+    FROM player_ranking_state s
+    JOIN players p ON p.id = s.player_id
+    LEFT JOIN clubs c ON c.id = p.club_id
+    WHERE s.age_category = p_age_category
+      AND (p_gender IS NULL OR s.gender = p_gender)
+      AND NOT (
+          p_age_limit
+          AND p_age_category ~ '^U[0-9]+$'
+          AND p.birth_date IS NOT NULL
+          AND EXTRACT(YEAR FROM s.as_of) - EXTRACT(YEAR FROM p.birth_date) > substring(p_age_category FROM 2)::INTEGER
+      )
+    ORDER BY 1;
+END;
+$$;
+
+COMMENT ON TABLE player_ranking_state IS 'Per-event totals and ranking_rules aggregate per player and age category, maintained by triggers on results';
+COMMENT ON FUNCTION get_current_rankings(TEXT, TEXT, BOOLEAN) IS 'Ranked players read from player_ranking_state; called by utils/ranking.ts and utils/ranking-snapshots.ts';
+
+-- Fill the state for the results already there
+SELECT refresh_player_ranking_state(ARRAY(SELECT id FROM players));
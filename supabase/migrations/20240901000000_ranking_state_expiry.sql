@@ -0,0 +1,193 @@
+-- Day-boundary expiry for player_ranking_state.
+--
+-- A result stops counting the day after its event's validity_date, so the
+-- standings change at midnight without any write. expire_player_ranking_state
+-- advances the state to a new day and refreshes only the players with
+-- results in the events whose validity ended in between. It takes the day
+-- as an argument, so it can be driven by a fake clock (expire_rankings.py
+-- --today / --until) against a local Postgres.
+--
+-- The events are found with idx_events_validity_age from get_rankings,
+-- whose leading validity_date column is the expiry order, and their players
+-- with idx_results_event.
+--
+-- Something has to run it every day shortly after midnight. With pg_cron
+-- (Supabase: Database -> Extensions) this migration schedules it; without
+-- it, schedule `python expire_rankings.py` (e.g. from cron or a CI job) or
+-- enable pg_cron and run the cron.schedule call at the end of this file.
+-- Until the state catches up, get_current_rankings ranks from the results
+-- for today with get_rankings instead of serving the stale day.
+
+-- One row per run; the as_of of the latest run is the day the whole state
+-- is valid for (not the largest one, as the clock may be set back)
+CREATE TABLE IF NOT EXISTS ranking_state_runs (
+    id BIGSERIAL PRIMARY KEY,
+    as_of DATE NOT NULL,
+    expired_events INTEGER NOT NULL DEFAULT 0,
+    refreshed_players INTEGER NOT NULL DEFAULT 0,
+    ran_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- The backfill in 20240801000000_player_ranking_state.sql ran for the day it
+-- was applied
+INSERT INTO ranking_state_runs (as_of, refreshed_players)
+SELECT COALESCE(MIN(as_of), CURRENT_DATE), COUNT(DISTINCT player_id)
+FROM player_ranking_state
+WHERE NOT EXISTS (SELECT 1 FROM ranking_state_runs);
+
+CREATE OR REPLACE FUNCTION ranking_state_as_of()
+RETURNS DATE
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT COALESCE((SELECT as_of FROM ranking_state_runs ORDER BY id DESC LIMIT 1), CURRENT_DATE);
+$$;
+
+CREATE OR REPLACE FUNCTION expire_player_ranking_state(p_today DATE DEFAULT CURRENT_DATE)
+RETURNS TABLE (from_date DATE, to_date DATE, expired_events INTEGER, refreshed_players INTEGER)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    last_as_of DATE;
+    event_ids UUID[];
+    player_ids UUID[];
+BEGIN
+    -- One run at a time, e.g. a cron run overlapping a manual one, and none
+    -- while result writes are refreshing players (see refresh_player_ranking_state)
+    PERFORM pg_advisory_xact_lock(hashtext('expire_player_ranking_state'));
+
+    last_as_of := ranking_state_as_of();
+    IF p_today = last_as_of THEN
+        RETURN QUERY SELECT last_as_of, p_today, 0, 0;
+        RETURN;
+    END IF;
+
+    -- Events valid on exactly one of the two days. Going forward these
+    -- expired; a clock set back brings them into the ranking again.
+    event_ids := ARRAY(
+        SELECT id FROM events
+        WHERE validity_date >= LEAST(last_as_of, p_today)
+          AND validity_date < GREATEST(last_as_of, p_today)
+    );
+    player_ids := ARRAY(SELECT DISTINCT r.player_id FROM results r WHERE r.event_id = ANY(event_ids));
+
+    PERFORM refresh_player_ranking_state(player_ids, p_today);
+
+    INSERT INTO ranking_state_runs (as_of, expired_events, refreshed_players)
+    VALUES (p_today, cardinality(event_ids), cardinality(player_ids));
+
+    RETURN QUERY SELECT last_as_of, p_today, cardinality(event_ids), cardinality(player_ids);
+END;
+$$;
+
+-- Without p_as_of a refresh now uses the state's day, not the wall clock, so
+-- writes between midnight and the next run never mix two days in the state.
+-- The trigger functions from 20240801000000 call it without p_as_of, so they
+-- pick this up as they are.
+CREATE OR REPLACE FUNCTION refresh_player_ranking_state(p_player_ids UUID[], p_as_of DATE DEFAULT NULL)
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    refreshed INTEGER;
+BEGIN
+    -- Shared with other writers, exclusive to expire_player_ranking_state:
+    -- a write waits for a running expiry and an expiry for writes in flight,
+    -- so no result lands in an event that expiry has already passed over
+    PERFORM pg_advisory_xact_lock_shared(hashtext('expire_player_ranking_state'));
+
+    -- Concurrent refreshes of the same player run one after the other;
+    -- NO KEY UPDATE still lets other sessions insert results for them
+    PERFORM 1 FROM players WHERE id = ANY(p_player_ids) ORDER BY id FOR NO KEY UPDATE;
+
+    -- The state's day is read only once the locks are held, so a refresh
+    -- that waited on an expiry uses the day it moved to
+    p_as_of := COALESCE(p_as_of, ranking_state_as_of());
+
+    DELETE FROM player_ranking_state WHERE player_id = ANY(p_player_ids);
+
+    INSERT INTO player_ranking_state (player_id, age_category, gender, total_points, events_count, event_points, as_of)
+    SELECT f.player_id, f.age_category, p.gender,
+           COALESCE(SUM(f.points) FILTER (WHERE f.counted), 0)::INTEGER,
+           COUNT(*) FILTER (WHERE f.counted)::INTEGER,
+           jsonb_agg(jsonb_build_object(
+               'event_id', f.event_id,
+               'type', f.type,
+               'validity_date', f.validity_date,
+               'points', f.points,
+               'counted', f.counted
+           ) ORDER BY f.points DESC, f.event_id),
+           p_as_of
+    FROM ranked_player_events(p_as_of, p_player_ids => p_player_ids, p_by_category => TRUE) f
+    JOIN players p ON p.id = f.player_id
+    GROUP BY f.player_id, f.age_category, p.gender;
+
+    GET DIAGNOSTICS refreshed = ROW_COUNT;
+    RETURN refreshed;
+END;
+$$;
+
+-- The age limit counts years up to the state's day as well. A state left
+-- behind by a missed expiry run is not served: the ranking falls back to
+-- get_rankings for today.
+CREATE OR REPLACE FUNCTION get_current_rankings(
+    p_gender TEXT DEFAULT NULL,
+    p_age_category TEXT DEFAULT NULL,
+    p_age_limit BOOLEAN DEFAULT FALSE
+)
+RETURNS TABLE (
+    rank_position INTEGER,
+    player_id UUID,
+    player_name TEXT,
+    gender TEXT,
+    club TEXT,
+    club_id UUID,
+    club_name TEXT,
+    birth_date DATE,
+    total_points INTEGER,
+    events_count INTEGER
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+    state_as_of DATE := ranking_state_as_of();
+BEGIN
+    -- The state holds no ranking across categories, and a stale day is
+    -- not served
+    IF p_age_category IS NULL OR state_as_of < CURRENT_DATE THEN
+        RETURN QUERY SELECT * FROM get_rankings(p_gender, p_age_category, GREATEST(state_as_of, CURRENT_DATE), p_age_limit);
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+    SELECT ROW_NUMBER() OVER (ORDER BY s.total_points DESC, p.name, p.id)::INTEGER,
+           p.id, p.name, p.gender, p.club, p.club_id, c.name, p.birth_date,
+           s.total_points, s.events_count
+    FROM player_ranking_state s
+    JOIN players p ON p.id = s.player_id
+    LEFT JOIN clubs c ON c.id = p.club_id
+    WHERE s.age_category = p_age_category
+      AND (p_gender IS NULL OR s.gender = p_gender)
+      AND NOT (
+          p_age_limit
+          AND p_age_category ~ '^U[0-9]+$'
+          AND p.birth_date IS NOT NULL
+          AND EXTRACT(YEAR FROM state_as_of) - EXTRACT(YEAR FROM p.birth_date) > substring(p_age_category FROM 2)::INTEGER
+      )
+    ORDER BY 1;
+END;
+$$;
+
+COMMENT ON FUNCTION expire_player_ranking_state(DATE) IS 'Moves player_ranking_state to p_today, refreshing only the players of events that expired in between; run daily after midnight';
+
+-- On Supabase with pg_cron enabled, run it every night (pg_cron works in UTC)
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+        PERFORM cron.schedule('expire-player-ranking-state', '5 0 * * *', 'SELECT * FROM expire_player_ranking_state()');
+    ELSE
+        RAISE NOTICE 'pg_cron is not installed: schedule expire_rankings.py to run daily after midnight, '
+                     'or get_current_rankings falls back to get_rankings once the day changes';
+    END IF;
+END $$;
@@ -0,0 +1,24 @@
+-- players.updated_at set by the database on every write. The importers'
+-- player directory (tt_import/players.py) only fetches players changed since
+-- the newest updated_at it has seen, so a writer that left the column alone
+-- would otherwise be missed without notice.
+
+ALTER TABLE players ALTER COLUMN updated_at SET DEFAULT NOW();
+
+CREATE OR REPLACE FUNCTION set_updated_at()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.updated_at := NOW();
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS players_set_updated_at ON players;
+CREATE TRIGGER players_set_updated_at
+    BEFORE INSERT OR UPDATE ON players
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+-- Rows written without it so far show up in the next incremental sync
+UPDATE players SET updated_at = NOW() WHERE updated_at IS NULL;
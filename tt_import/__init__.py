@@ -0,0 +1,15 @@
+"""Import extracted ranking points into Supabase.
+
+Stages: load -> resolve players -> resolve events -> diff -> write.
+Run with ``python -m tt_import --categories U11,U13 --source dataset``.
+"""
+
+__all__ = ['run_import']
+
+def __getattr__(name):
+    # The pipeline pulls in the Supabase client; importing it on first use
+    # keeps tt_import.timing usable by the PDF tools without the REST stack
+    if name == 'run_import':
+        from .pipeline import run_import
+        return run_import
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,77 @@
+import argparse
+import os
+import sys
+import detailed_points
+from .client import create_async_supabase, create_supabase, load_db_url
+from .pipeline import run_import
+from .matching import MATCH_THRESHOLD
+from .players import PLAYER_CACHE_PATH
+from .sources import GENDERS, SOURCES, available_categories
+from .timing import StageTimer, add_timing_arguments, profiled
+from .writer import FatalWriteError
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m tt_import', description="Import extracted ranking points into Supabase, writing only what changed.")
+    parser.add_argument('--categories', default=None, help="Comma-separated age categories, e.g. U11,U13,U15 (default: every category in the dataset)")
+    parser.add_argument('--source', choices=SOURCES, default='dataset', help="Read the Parquet dataset or the optional XLSX export (default: dataset)")
+    parser.add_argument('--dataset-dir', default=detailed_points.DATASET_DIR, help=f"Extracted dataset directory (default: {detailed_points.DATASET_DIR})")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="Categories processed concurrently within a stage (default: CPU count)")
+    parser.add_argument('--delete-missing', action='store_true', help="Delete Egyes results of the imported events that are no longer in the dataset")
+    parser.add_argument('--dry-run', action='store_true', help="Only report the difference against the database")
+    parser.add_argument('--missing-players-file', default=None, help="Append players missing from the database to this file")
+    parser.add_argument('--rest-url', default=None, help="Talk to this PostgREST server instead of Supabase, e.g. http://localhost:3000")
+    parser.add_argument('--max-in-flight', type=int, default=4, help="Result batches sent concurrently (default: 4)")
+    parser.add_argument('--batch-size', type=int, default=500, help="Initial result batch size, adapted to observed latency (default: 500)")
+    parser.add_argument('--dead-letter', default='input/rejected_results.jsonl', help="Append rows the database rejects to this JSON lines file (default: input/rejected_results.jsonl)")
+    parser.add_argument('--player-cache', default=PLAYER_CACHE_PATH, help=f"Local player directory snapshot (default: {PLAYER_CACHE_PATH})")
+    parser.add_argument('--refresh-players', action='store_true', help="Re-download every player instead of only the ones changed since the last sync")
+    parser.add_argument('--event-match-threshold', type=float, default=MATCH_THRESHOLD, help=f"Reuse an existing event of the same date and age group when the names are at least this similar; above 1 disables fuzzy matching (default: {MATCH_THRESHOLD})")
+    parser.add_argument('--event-report', default='input/event_matches.csv', help="Write how parsed competitions were matched to events to this CSV (default: input/event_matches.csv)")
+    parser.add_argument('--verify', action='store_true', help="Check the extraction against the ranking list CSVs first and stop if a licence or rank differs")
+    parser.add_argument('--copy', action='store_true', help="Load straight into Postgres with COPY in one transaction (needs psycopg)")
+    parser.add_argument('--db-url', default=None, help="Postgres connection URL for --copy (default: SUPABASE_DB_URL or DATABASE_URL from .env.local)")
+    add_timing_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if args.categories:
+        categories = [c.strip() for c in args.categories.split(',') if c.strip()]
+    else:
+        categories = available_categories(args.dataset_dir)
+    if not categories:
+        parser.error("no categories to import")
+
+    timer = StageTimer(args.timings)
+    with profiled(args.profile):
+        if args.verify:
+            # verify_extraction.py lives next to detailed_points.py at the top level
+            from verify_extraction import describe, verify_categories
+            input_dir = os.path.dirname(os.path.normpath(args.dataset_dir))
+            reports = verify_categories([f"{cat}{g}" for cat in categories for g in GENDERS], input_dir,
+                                        args.dataset_dir, timer=timer)
+            for report in reports:
+                print(describe(report))
+            if not all(r['ok'] for r in reports):
+                sys.exit("Extraction verification failed, nothing imported.")
+
+        db_url = None
+        if args.copy:
+            db_url = args.db_url or load_db_url()
+            if not db_url:
+                parser.error("--copy needs --db-url or SUPABASE_DB_URL in .env.local")
+
+        supabase = None if db_url else create_supabase(rest_url=args.rest_url)
+        try:
+            run_import(supabase, categories, source=args.source, dataset_dir=args.dataset_dir, workers=args.workers,
+                       dry_run=args.dry_run, delete_missing=args.delete_missing,
+                       missing_players_file=args.missing_players_file, timer=timer,
+                       async_client_factory=lambda: create_async_supabase(rest_url=args.rest_url),
+                       writer_options={
+                           'max_in_flight': args.max_in_flight,
+                           'batch_size': args.batch_size,
+                           'dead_letter_path': args.dead_letter,
+                       },
+                       db_url=db_url, player_cache=args.player_cache, refresh_players=args.refresh_players,
+                       event_match_threshold=args.event_match_threshold, event_report=args.event_report)
+        except FatalWriteError as e:
+            sys.exit(f"Import aborted: {e}")
+    print(timer.report())
@@ -0,0 +1,28 @@
+import os
+from dotenv import load_dotenv
+from postgrest import AsyncPostgrestClient, SyncPostgrestClient
+from supabase import acreate_client, create_client
+
+# With rest_url set, both clients talk to a plain PostgREST server instead of
+# Supabase, e.g. a local PostgREST in front of a scratch Postgres for offline runs
+
+def load_credentials(env_file='.env.local'):
+    load_dotenv(env_file)
+    return os.environ.get('NEXT_PUBLIC_SUPABASE_URL'), os.environ.get('NEXT_PUBLIC_SUPABASE_ANON_KEY')
+
+def load_db_url(env_file='.env.local'):
+    # Direct Postgres connection for the COPY backend, e.g. the Supabase pooler URL
+    load_dotenv(env_file)
+    return os.environ.get('SUPABASE_DB_URL') or os.environ.get('DATABASE_URL')
+
+def create_supabase(env_file='.env.local', rest_url=None):
+    if rest_url:
+        return SyncPostgrestClient(rest_url)
+    url, key = load_credentials(env_file)
+    return create_client(url, key)
+
+async def create_async_supabase(env_file='.env.local', rest_url=None):
+    if rest_url:
+        return AsyncPostgrestClient(rest_url)
+    url, key = load_credentials(env_file)
+    return await acreate_client(url, key)
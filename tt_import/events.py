@@ -0,0 +1,168 @@
+import unicodedata
+from .matching import MATCH_THRESHOLD, REVIEW_THRESHOLD, CompetitionMatcher, write_match_report
+from .paging import fetch_all
+
+# Ranking list categories whose events use a different age_category in the app
+EVENT_AGE_CATEGORIES = {'Felnőtt': 'Senior'}
+
+# Type of the events the import creates. Competition names carry no reliable
+# type, so the admin sets OB, TOP, I./II. osztály and so on afterwards.
+IMPORTED_EVENT_TYPE = 'Ranglista'
+
+# Best max_events events count, at most type_limits[type] of a type. The
+# database reads them from the ranking_rules table; this is the row the
+# migrations seed, for the checks that run without a database.
+RANKING_RULES = {'max_events': 6, 'type_limits': {'II. osztály': 2}}
+
+def event_age_category(cat):
+    cat = unicodedata.normalize('NFC', cat)
+    return EVENT_AGE_CATEGORIES.get(cat, cat)
+
+def normalize_event_name(name):
+    # Same as lower(normalize(regexp_replace(btrim(name), '\s+', ' ', 'g'), NFC)) in SQL
+    return ' '.join(unicodedata.normalize('NFC', name).split()).lower()
+
+def event_key(name, date, age_category):
+    # The rankings filter results by their event's age_category, so one
+    # tournament ranking several age groups is one event per age group
+    return (normalize_event_name(name), str(date)[:10], unicodedata.normalize('NFC', age_category))
+
+def validity_date_for(comp_date):
+    # Ranking points are valid for one year
+    try:
+        year = int(comp_date[:4])
+        return f"{year+1}{comp_date[4:]}"
+    except (TypeError, ValueError):
+        return comp_date
+
+def new_event(name, date, age_category):
+    return {
+        'name': name,
+        'date': date,
+        'validity_date': validity_date_for(date),
+        'age_category': age_category,
+        'type': IMPORTED_EVENT_TYPE,
+        'has_egyes': True,
+        'has_csapat': False,
+        'has_paros': False,
+        'has_vegyes': False,
+        'gender': 'Both'
+    }
+
+def category_competitions(df):
+    unique_events = df[['Competition Name', 'Date']].drop_duplicates().dropna()
+    return list(zip(unique_events['Competition Name'], unique_events['Date']))
+
+class EventIndex:
+    """All events keyed by normalized (name, date, age_category).
+
+    Parsed competitions that miss the exact key are matched fuzzily within
+    their date and age group, so text-layer glitches in a name reuse the
+    existing event instead of creating a near-duplicate.
+    """
+
+    def __init__(self, events=(), threshold=MATCH_THRESHOLD):
+        self.ids = {}
+        self.names = {}
+        # Parsed key -> key of the event it was fuzzily matched to
+        self.aliases = {}
+        self.matcher = CompetitionMatcher()
+        self.threshold = threshold
+        self.report = []
+        self.add(events)
+
+    @classmethod
+    def load(cls, supabase, threshold=MATCH_THRESHOLD):
+        # Paged by id, so the index is complete past the PostgREST row limit
+        return cls(fetch_all(supabase, 'events', 'id, name, date, age_category'), threshold)
+
+    def add(self, events):
+        for e in events:
+            key = event_key(e['name'], e['date'], e['age_category'])
+            if key not in self.names:
+                self.matcher.add(key, e['name'])
+            self.ids[key] = e['id']
+            self.names[key] = e['name']
+
+    def __len__(self):
+        return len(self.ids)
+
+    def lookup(self, name, date, age_category):
+        key = event_key(name, date, age_category)
+        return self.aliases.get(key, key)
+
+    def missing(self, frames):
+        # New events for every (competition, age group) the frames mention.
+        # Planned events join the index without an id, so near-duplicates
+        # within the same import collapse onto the first spelling.
+        to_insert = []
+        for cat, df in frames:
+            age_category = event_age_category(cat)
+            for name, date in category_competitions(df):
+                key = event_key(name, date, age_category)
+                if key in self.ids or key in self.aliases:
+                    continue
+                match, score = self.matcher.best(name, key[1:])
+                row = {'score': f"{score:.2f}", 'category': cat, 'date': date, 'name': name,
+                       'matched_name': self.names[match] if match else '', 'event_id': self.ids.get(match) or ''}
+                if match and score >= self.threshold:
+                    self.aliases[key] = match
+                    self.report.append({**row, 'action': 'matched'})
+                    continue
+                self.report.append({**row, 'action': 'review' if score >= REVIEW_THRESHOLD else 'new'})
+                self.add([{'id': None, 'name': name, 'date': date, 'age_category': age_category}])
+                to_insert.append(new_event(name, date, age_category))
+        return to_insert
+
+    def canonical_name(self, name, date, age_category):
+        return self.names.get(self.lookup(name, date, age_category), name)
+
+    def resolve(self, frames):
+        # {cat: {(competition name, date): event id}} in one pass, so building
+        # the results is a plain dict lookup per row
+        resolved = {}
+        for cat, df in frames:
+            age_category = event_age_category(cat)
+            ids = {}
+            for name, date in category_competitions(df):
+                event_id = self.ids.get(self.lookup(name, date, age_category))
+                if event_id:
+                    ids[(name, date)] = event_id
+            resolved[cat] = ids
+        return resolved
+
+def summarize_matches(index, report_path=None):
+    counts = {}
+    for row in index.report:
+        counts[row['action']] = counts.get(row['action'], 0) + 1
+    if counts:
+        print("Competition matching: " + ", ".join(f"{n} {action}" for action, n in sorted(counts.items())))
+    if report_path and index.report:
+        write_match_report(report_path, index.report)
+        print(f"Wrote competition match report to {report_path}")
+
+def resolve_events(supabase, frames, dry_run=False, batch_size=500, threshold=MATCH_THRESHOLD, report_path=None):
+    # Returns ({cat: {(name, date): event id}}, number of new events)
+    index = EventIndex.load(supabase, threshold)
+    print(f"Loaded {len(index)} events from Supabase.")
+    events_to_insert = index.missing(frames)
+    summarize_matches(index, report_path)
+    if not events_to_insert:
+        return index.resolve(frames), 0
+
+    if dry_run:
+        print(f"Would insert {len(events_to_insert)} new events.")
+        return index.resolve(frames), len(events_to_insert)
+
+    print(f"Inserting {len(events_to_insert)} new events...")
+    try:
+        for i in range(0, len(events_to_insert), batch_size):
+            insert_res = supabase.table('events').insert(events_to_insert[i:i + batch_size]).execute()
+            index.add(insert_res.data)
+    except Exception as e:
+        print(f"Error inserting events: {e}")
+        # Some of them may have been inserted anyway; matching again
+        # restores the aliases
+        index = EventIndex.load(supabase, threshold)
+        index.missing(frames)
+    return index.resolve(frames), len(events_to_insert)
@@ -0,0 +1,80 @@
+import csv
+import re
+import unicodedata
+from collections import defaultdict
+
+# Reuse an existing event when the names are at least this similar
+MATCH_THRESHOLD = 0.85
+# Below the threshold but above this, the new event is flagged for review
+REVIEW_THRESHOLD = 0.6
+
+REPORT_COLUMNS = ['action', 'score', 'category', 'date', 'name', 'matched_name', 'event_id']
+
+ROMAN_NUMERAL = re.compile(r'^[ivxl]+$')
+
+def fold_name(name):
+    # NFKC expands real ligatures (U+FB01 -> 'fi'); then diacritics,
+    # punctuation and case are dropped
+    name = unicodedata.normalize('NFKD', unicodedata.normalize('NFKC', name))
+    name = ''.join(c for c in name if not unicodedata.combining(c)).lower()
+    return ' '.join(re.sub(r'[^0-9a-z]+', ' ', name).split())
+
+def trigrams(folded):
+    padded = f"  {folded} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def distinguishing_tokens(folded):
+    # Numbers and roman numerals tell apart otherwise identical names,
+    # e.g. 'I. osztályú' and 'II. osztályú' or U13 and U15
+    return frozenset(t for t in re.findall(r'[0-9a-z]+', folded)
+                     if any(c.isdigit() for c in t) or ROMAN_NUMERAL.match(t))
+
+class CompetitionMatcher:
+    """Blocks events by (date, age_category) and scores names by trigram similarity.
+
+    Only events in the same block that share a trigram with the query are
+    scored, so a lookup doesn't scan the whole events table.
+    """
+
+    def __init__(self):
+        self.blocks = defaultdict(lambda: defaultdict(set))
+        self.grams = {}
+        self.tokens = {}
+
+    def add(self, key, name):
+        # key is an events.event_key tuple: (normalized name, date, age_category)
+        folded = fold_name(name)
+        self.grams[key] = trigrams(folded)
+        self.tokens[key] = distinguishing_tokens(folded)
+        block = self.blocks[key[1:]]
+        for gram in self.grams[key]:
+            block[gram].add(key)
+
+    def best(self, name, block):
+        # Returns (key, score) of the most similar event in the block, or (None, 0.0)
+        folded = fold_name(name)
+        grams = trigrams(folded)
+        tokens = distinguishing_tokens(folded)
+        index = self.blocks.get(block)
+        if not index:
+            return None, 0.0
+        shared = defaultdict(int)
+        for gram in grams:
+            for key in index.get(gram, ()):
+                shared[key] += 1
+        best_key, best_score = None, 0.0
+        for key, count in shared.items():
+            score = count / (len(grams) + len(self.grams[key]) - count)
+            if self.tokens[key] != tokens:
+                # Never merge across a differing number, only flag it
+                score = min(score, REVIEW_THRESHOLD)
+            if score > best_score:
+                best_key, best_score = key, score
+        return best_key, best_score
+
+def write_match_report(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_COLUMNS)
+        writer.writeheader()
+        for row in sorted(rows, key=lambda r: (r['action'], r['date'], r['name'])):
+            writer.writerow(row)
@@ -0,0 +1,34 @@
+from concurrent.futures import ThreadPoolExecutor
+
+# Row ids are UUIDs, so splitting on the first hex digit gives 16 disjoint
+# id ranges that can be keyset-paged side by side
+ID_RANGE_STARTS = [f"{d:x}0000000-0000-0000-0000-000000000000" for d in range(16)]
+
+def id_ranges():
+    return list(zip(ID_RANGE_STARTS, ID_RANGE_STARTS[1:] + [None]))
+
+def fetch_range(supabase, table, columns, lo, hi, filters=(), page_size=1000):
+    # Keyset paging: each page starts after the last id seen, so the cost of
+    # a page doesn't grow with its position like .range() offsets do. Only an
+    # empty page ends the range: a PostgREST max-rows below page_size returns
+    # short pages that are not the last one.
+    rows = []
+    last_id = None
+    while True:
+        query = supabase.table(table).select(columns).order('id').limit(page_size)
+        query = query.gt('id', last_id) if last_id else query.gte('id', lo)
+        if hi:
+            query = query.lt('id', hi)
+        for method, column, value in filters:
+            query = getattr(query, method)(column, value)
+        res = query.execute()
+        if not res.data:
+            return rows
+        rows.extend(res.data)
+        last_id = res.data[-1]['id']
+
+def fetch_all(supabase, table, columns, filters=(), page_size=1000, workers=8):
+    # filters are (method, column, value) triples, e.g. ('gte', 'updated_at', ts)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pages = pool.map(lambda r: fetch_range(supabase, table, columns, r[0], r[1], filters, page_size), id_ranges())
+        return [row for rows in pages for row in rows]
@@ -0,0 +1,179 @@
+import pandas as pd
+import psycopg
+from .events import EventIndex, category_competitions, event_age_category, new_event, summarize_matches
+from .matching import MATCH_THRESHOLD
+from .results import ResultsDiff
+from .timing import StageTimer
+
+# Direct Postgres backend: the whole import is one transaction that COPYs the
+# parsed rows into temp tables and merges them with INSERT ... ON CONFLICT.
+# Works through the Supabase pooler URL (transaction mode) as well, since the
+# temp tables only live inside the transaction.
+
+EVENT_COLUMNS = list(new_event('', '', '').keys())
+
+# Matches events.normalize_event_name
+def normalized_name(column):
+    return f"lower(normalize(regexp_replace(btrim({column}), '\\s+', ' ', 'g'), NFC))"
+
+def event_match(name_column):
+    # Matches event e against staged row i, like events.event_key
+    return (f"{normalized_name('e.name')} = {normalized_name(name_column)} "
+            "AND e.date = i.date AND e.age_category = i.age_category")
+
+def connect(db_url):
+    # Server-side prepared statements don't survive a transaction-mode pooler
+    return psycopg.connect(db_url, prepare_threshold=None)
+
+def load_event_index(cur, threshold):
+    cur.execute("SELECT id::text, name, date::text, age_category FROM events")
+    return EventIndex(({'id': i, 'name': n, 'date': d, 'age_category': a} for i, n, d, a in cur.fetchall()), threshold)
+
+def canonical_frames(index, frames):
+    # Rename fuzzily matched competitions to their event's name, so the SQL
+    # joins only need the exact normalized key
+    renamed = []
+    for cat, df in frames:
+        age_category = event_age_category(cat)
+        names = {}
+        for name, date in category_competitions(df):
+            canonical = index.canonical_name(name, date, age_category)
+            if canonical != name:
+                names[(name, date)] = canonical
+        if names:
+            df = df.copy()
+            df['Competition Name'] = [names.get(k, k[0]) for k in zip(df['Competition Name'], df['Date'])]
+        renamed.append((cat, df))
+    return renamed
+
+def staged_results(frames):
+    seq = 0
+    for cat, df in frames:
+        age_category = event_age_category(cat)
+        for name, licence, comp_name, comp_date, points in zip(
+                df['Name'], df['Licence ID'], df['Competition Name'], df['Date'], df['Points']):
+            if pd.isna(comp_date) or not licence or licence == 'nan':
+                continue
+            seq += 1
+            yield (seq, cat, age_category, name, licence, comp_name, comp_date, int(points))
+
+def copy_rows(cur, table, columns, rows):
+    with cur.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+        for row in rows:
+            copy.write_row(row)
+
+def merge_events(cur, events_to_insert):
+    cur.execute(f"""
+        CREATE TEMP TABLE import_events ON COMMIT DROP AS
+        SELECT {', '.join(EVENT_COLUMNS)} FROM events WITH NO DATA
+    """)
+    copy_rows(cur, 'import_events', EVENT_COLUMNS, ([e[c] for c in EVENT_COLUMNS] for e in events_to_insert))
+    # events has no unique key to conflict on (names only match after
+    # normalizing), so duplicates are kept out by the NOT EXISTS check under
+    # copy_import's table lock, and by taking one staged row per key
+    cur.execute(f"""
+        INSERT INTO events ({', '.join(EVENT_COLUMNS)})
+        SELECT DISTINCT ON ({normalized_name('i.name')}, i.date, i.age_category)
+               {', '.join('i.' + c for c in EVENT_COLUMNS)}
+        FROM import_events i
+        WHERE NOT EXISTS (SELECT 1 FROM events e WHERE {event_match('i.name')})
+        ORDER BY {normalized_name('i.name')}, i.date, i.age_category
+        RETURNING id
+    """)
+    return len(cur.fetchall())
+
+def merge_results(cur, frames, delete_missing):
+    cur.execute("""
+        CREATE TEMP TABLE import_results (
+            seq integer,
+            source_category text,
+            age_category text,
+            name text,
+            licence text,
+            competition_name text,
+            date date,
+            points integer
+        ) ON COMMIT DROP
+    """)
+    copy_rows(cur, 'import_results',
+              ['seq', 'source_category', 'age_category', 'name', 'licence', 'competition_name', 'date', 'points'],
+              staged_results(frames))
+    cur.execute("ANALYZE import_results")
+
+    # Resolve events and players in SQL; later rows win on a repeated key,
+    # matching diff_frames
+    cur.execute(f"""
+        CREATE TEMP TABLE import_resolved ON COMMIT DROP AS
+        SELECT DISTINCT ON (e.id, p.id) e.id AS event_id, p.id AS player_id, i.points
+        FROM import_results i
+        JOIN events e ON {event_match('i.competition_name')}
+        JOIN players p ON p.license_id = i.licence
+        ORDER BY e.id, p.id, i.seq DESC
+    """)
+    parsed = cur.rowcount
+
+    # xmax = 0 only for freshly inserted rows; unchanged rows are skipped by
+    # the WHERE so they are neither rewritten nor returned
+    cur.execute("""
+        INSERT INTO results (event_id, player_id, category, points, position)
+        SELECT event_id, player_id, 'Egyes', points, '-' FROM import_resolved
+        ON CONFLICT (event_id, player_id, category)
+        DO UPDATE SET points = EXCLUDED.points
+        WHERE results.points IS DISTINCT FROM EXCLUDED.points
+        RETURNING id, (xmax = 0) AS inserted
+    """)
+    inserts, updates = [], []
+    for result_id, inserted in cur.fetchall():
+        (inserts if inserted else updates).append(result_id)
+
+    deletes = []
+    if delete_missing:
+        cur.execute("""
+            DELETE FROM results r
+            WHERE r.category = 'Egyes'
+              AND r.event_id IN (SELECT DISTINCT event_id FROM import_resolved)
+              AND NOT EXISTS (SELECT 1 FROM import_resolved i
+                              WHERE i.event_id = r.event_id AND i.player_id = r.player_id)
+            RETURNING r.id
+        """)
+        deletes = [row[0] for row in cur.fetchall()]
+
+    cur.execute("""
+        SELECT DISTINCT s.source_category, s.name, s.licence
+        FROM import_results s
+        WHERE NOT EXISTS (SELECT 1 FROM players p WHERE p.license_id = s.licence)
+    """)
+    missing_by_category = {cat: set() for cat, _ in frames}
+    for cat, name, licence in cur.fetchall():
+        missing_by_category[cat].add(f"{name} ({licence})")
+
+    unchanged = parsed - len(inserts) - len(updates)
+    return ResultsDiff(inserts, updates, deletes, unchanged), missing_by_category
+
+def copy_import(db_url, frames, delete_missing=False, dry_run=False, timer=None,
+                threshold=MATCH_THRESHOLD, report_path=None):
+    """Merge the loaded category frames into events and results in one transaction.
+
+    Returns a ResultsDiff whose inserts, updates and deletes hold result ids,
+    and the missing players per category. With dry_run the transaction is
+    rolled back, so the counts are exact but nothing is kept.
+    """
+    timer = timer or StageTimer()
+    with connect(db_url) as conn:
+        with conn.cursor() as cur:
+            # Concurrent imports would race on the NOT EXISTS check for events
+            cur.execute("LOCK TABLE events IN SHARE ROW EXCLUSIVE MODE")
+            with timer.stage('copy events') as stage:
+                index = load_event_index(cur, threshold)
+                events_to_insert = index.missing(frames)
+                summarize_matches(index, report_path)
+                frames = canonical_frames(index, frames)
+                inserted = merge_events(cur, events_to_insert)
+                stage['rows'] = inserted
+                print(f"{'Would insert' if dry_run else 'Inserted'} {inserted} new events.")
+            with timer.stage('copy results') as stage:
+                diff, missing_by_category = merge_results(cur, frames, delete_missing)
+                stage['rows'] = len(diff.inserts) + len(diff.updates) + len(diff.deletes)
+        if dry_run:
+            conn.rollback()
+    return diff, missing_by_category
@@ -0,0 +1,111 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import detailed_points
+from .events import resolve_events
+from .matching import MATCH_THRESHOLD
+from .players import PLAYER_CACHE_PATH, load_player_map
+from .results import RESULT_COLUMNS, build_results_frame, describe_diff, diff_frames, fetch_existing_results, write_diff
+from .sources import load_category
+from .timing import StageTimer
+from .writer import BatchWriter
+
+def write_missing_players(path, missing_by_category):
+    with open(path, 'a', encoding='utf-8') as f:
+        for cat, missing in missing_by_category.items():
+            missing = sorted(missing)
+            if missing:
+                f.write(f"\nMissing Players in Supabase DB ({cat}):\n")
+                f.write("-" * 40 + "\n")
+                for p in missing:
+                    f.write(p + '\n')
+            print(f"[{cat}] Wrote {len(missing)} missing players to {path}")
+
+def copy_into_postgres(db_url, frames, dry_run, delete_missing, missing_players_file, timer,
+                       event_match_threshold, event_report):
+    # Imported lazily so the REST path doesn't need psycopg installed
+    from .pgcopy import copy_import
+    diff, missing_by_category = copy_import(db_url, frames, delete_missing, dry_run, timer,
+                                            event_match_threshold, event_report)
+    for cat, missing in missing_by_category.items():
+        if missing:
+            print(f"[{cat}] Warning: {len(missing)} players not found in DB by licence ID, e.g. {sorted(missing)[:5]}")
+    print(f"{'Would write' if dry_run else 'Wrote'} results: {describe_diff(diff)}")
+    if missing_players_file:
+        write_missing_players(missing_players_file, missing_by_category)
+    return diff
+
+def run_import(supabase, categories, source='dataset', dataset_dir=detailed_points.DATASET_DIR,
+               workers=None, dry_run=False, delete_missing=False, missing_players_file=None, timer=None,
+               async_client_factory=None, writer_options=None, db_url=None,
+               player_cache=PLAYER_CACHE_PATH, refresh_players=False,
+               event_match_threshold=MATCH_THRESHOLD, event_report=None):
+    # async_client_factory is a coroutine function returning the client the
+    # batch writer uses, e.g. client.create_async_supabase. With db_url set
+    # the import goes straight to Postgres and supabase is not used.
+    timer = timer or StageTimer()
+    workers = workers or min(len(categories), os.cpu_count() or 1) or 1
+
+    # Stages run in order; within a stage the categories fan out over the pool
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        with timer.stage('load') as stage:
+            loaded = pool.map(lambda cat: (cat, load_category(cat, source, dataset_dir)), categories)
+            frames = []
+            for cat, df in loaded:
+                if df is None:
+                    print(f"Skipping {cat}: files not found.")
+                    continue
+                print(f"[{cat}] Total results to import: {len(df)}")
+                frames.append((cat, df))
+            stage['rows'] = sum(len(df) for _, df in frames)
+
+        if db_url:
+            return copy_into_postgres(db_url, frames, dry_run, delete_missing, missing_players_file, timer,
+                                      event_match_threshold, event_report)
+
+        with timer.stage('resolve players') as stage:
+            player_map = load_player_map(supabase, player_cache, refresh_players)
+            stage['rows'] = len(player_map)
+            print(f"Loaded {len(player_map)} players from Supabase.")
+
+        # Every category's competitions are resolved against one event index
+        with timer.stage('resolve events') as stage:
+            events_by_category, inserted = resolve_events(supabase, frames, dry_run, threshold=event_match_threshold,
+                                                          report_path=event_report)
+            stage['rows'] = inserted
+
+        def build_category(item):
+            cat, df = item
+            return (cat, *build_results_frame(df, player_map, events_by_category[cat]))
+
+        # Categories are diffed together so deletes see every imported row;
+        # later categories win on a clash
+        with timer.stage('diff') as stage:
+            built = list(pool.map(build_category, frames))
+            for cat, rows, missing in built:
+                print(f"[{cat}] Built {len(rows)} results")
+                if missing:
+                    print(f"[{cat}] Warning: {len(missing)} players not found in DB by licence ID, e.g. {sorted(missing)[:5]}")
+            parsed_results = pd.concat([rows for _, rows, _ in built] or [pd.DataFrame(columns=RESULT_COLUMNS)],
+                                       ignore_index=True)
+            existing_results = fetch_existing_results(supabase, parsed_results['event_id'].unique().tolist())
+            diff = diff_frames(parsed_results, existing_results)
+            print(f"Compared {len(parsed_results)} parsed results with {len(existing_results)} in the database: {describe_diff(diff)}")
+            stage['rows'] = len(parsed_results)
+
+    if not dry_run:
+        with timer.stage('write') as stage:
+            async def write():
+                writer = BatchWriter(await async_client_factory(), **(writer_options or {}))
+                await write_diff(writer, diff, delete_missing)
+                return writer
+
+            writer = asyncio.run(write())
+            print(writer.stats.summary(writer.batch_size))
+            stage['rows'] = writer.stats.rows_written
+
+    if missing_players_file:
+        write_missing_players(missing_players_file, {cat: missing for cat, _, missing in built})
+
+    return diff
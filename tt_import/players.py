@@ -0,0 +1,66 @@
+import json
+import os
+from .paging import fetch_all
+
+PLAYER_CACHE_PATH = os.path.join('input', '.player_cache', 'players.json')
+
+def fetch_players(supabase, since=None):
+    filters = [('gte', 'updated_at', since)] if since else []
+    return fetch_all(supabase, 'players', 'id, license_id, updated_at', filters)
+
+class PlayerDirectory:
+    """Local snapshot of the players table (id -> license_id).
+
+    The first sync downloads every player; later syncs only fetch rows whose
+    updated_at is at or after the newest one already seen. Deleted players
+    are only noticed by a full sync.
+    """
+
+    def __init__(self, path=PLAYER_CACHE_PATH):
+        self.path = path
+        self.players = {}
+        self.watermark = None
+
+    def load(self):
+        if not self.path:
+            return False
+        # A missing, unreadable or malformed cache means a full reload
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            players, watermark = dict(data['players']), data['watermark']
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        self.players = players
+        self.watermark = watermark
+        return True
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'watermark': self.watermark, 'players': self.players}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def sync(self, supabase, full=False):
+        incremental = not full and self.load() and self.watermark
+        if not incremental:
+            self.players = {}
+            self.watermark = None
+        rows = fetch_players(supabase, since=self.watermark if incremental else None)
+        for p in rows:
+            self.players[p['id']] = p.get('license_id')
+            if p.get('updated_at') and (self.watermark is None or p['updated_at'] > self.watermark):
+                self.watermark = p['updated_at']
+        if self.path:
+            self.save()
+        kind = "changed" if incremental else "all"
+        print(f"Synced players: {len(rows)} {kind} rows fetched, {len(self.players)} in directory.")
+        return self
+
+    def licence_map(self):
+        return {str(licence).strip(): player_id for player_id, licence in self.players.items() if licence}
+
+def load_player_map(supabase, cache_path=PLAYER_CACHE_PATH, refresh=False):
+    # cache_path=None always downloads the full table and keeps nothing on disk
+    return PlayerDirectory(cache_path).sync(supabase, full=refresh).licence_map()
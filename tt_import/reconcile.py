@@ -0,0 +1,143 @@
+import csv
+import json
+import os
+import re
+import unicodedata
+from collections import defaultdict
+import ranking_lists
+from .paging import fetch_all
+
+CANDIDATE_COLUMNS = [
+    'licence', 'name', 'club', 'age_group', 'rank', 'score', 'name_score', 'club_score', 'birth_year_ok',
+    'player_id', 'player_licence', 'player_name', 'player_club', 'player_birth_date',
+]
+
+# Words every club name is full of; they say nothing about which club it is
+CLUB_STOPWORDS = {
+    'se', 'sc', 'ase', 'sk', 'kft', 'egyesulet', 'sportegyesulet', 'sport', 'club', 'klub', 'asztalitenisz',
+    'atletikai', 'torna', 'egylet', 'es', 'a', 'az', 'ii', 'kerulet',
+}
+
+def fold(text):
+    # Accent-folded, lowercase, punctuation dropped: 'Bálint Dávid' -> 'balint david'
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    return ' '.join(re.sub(r'[^0-9a-z]+', ' ', text).split())
+
+def name_grams(folded):
+    # Tokens are sorted first, so 'Nagy Rebeka Fanni' and 'Nagy Fanni Rebeka' agree
+    padded = f"  {' '.join(sorted(folded.split()))} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def club_tokens(club):
+    if not club:
+        return set()
+    return {t for t in fold(club).split() if t not in CLUB_STOPWORDS and not t.isdigit()}
+
+def birth_year(birth_date):
+    match = re.match(r'(\d{4})', str(birth_date or ''))
+    return int(match.group(1)) if match else None
+
+def birth_year_ok(year, age_group, season):
+    # U15 in the 2025 season means born in 2010 or later; None when unknown
+    match = re.match(r'U(\d+)$', str(age_group or ''))
+    if year is None or not match:
+        return None
+    return year >= season - int(match.group(1))
+
+class PlayerNameIndex:
+    """Inverted index from folded name tokens to players.
+
+    A lookup only scores the players sharing at least one name token, so
+    reconciling thousands of licences stays a sub-second job.
+    """
+
+    def __init__(self, players):
+        self.players = list(players)
+        self.tokens = defaultdict(set)
+        self.grams = []
+        self.clubs = []
+        for i, p in enumerate(self.players):
+            folded = fold(p.get('name') or '')
+            self.grams.append(name_grams(folded))
+            self.clubs.append(club_tokens(p.get('club')))
+            for token in folded.split():
+                self.tokens[token].add(i)
+
+    def candidates(self, name, club=None, age_group=None, season=None, limit=3, min_score=0.5):
+        folded = fold(name)
+        grams = name_grams(folded)
+        clubs = club_tokens(club)
+        seen = set()
+        for token in folded.split():
+            seen |= self.tokens.get(token, set())
+
+        scored = []
+        for i in seen:
+            player = self.players[i]
+            shared = len(grams & self.grams[i])
+            name_score = 2 * shared / (len(grams) + len(self.grams[i]))
+            club_score = len(clubs & self.clubs[i]) / len(clubs | self.clubs[i]) if clubs and self.clubs[i] else 0.0
+            year_ok = birth_year_ok(birth_year(player.get('birth_date')), age_group, season)
+            score = 0.75 * name_score + 0.25 * club_score
+            if year_ok is False:
+                score -= 0.2
+            if score >= min_score:
+                scored.append((score, name_score, club_score, year_ok, player))
+        scored.sort(key=lambda s: s[0], reverse=True)
+        return scored[:limit]
+
+def load_players(supabase):
+    return fetch_all(supabase, 'players', 'id, license_id, name, club, birth_date')
+
+def read_licence_info(input_dir, categories):
+    # The ranking list CSVs carry the club and age group next to each licence
+    info = {}
+    for cat in categories:
+        for gender in ('F', 'N'):
+            path = os.path.join(input_dir, f"{cat}{gender}.csv")
+            if not os.path.exists(path):
+                continue
+            for licence, person in ranking_lists.licence_info(path).items():
+                info.setdefault(licence, person)
+    return info
+
+def reconcile(missing, players, season, limit=3, min_score=0.5):
+    # missing is {licence: {'name', 'club', 'age_group'}}; returns candidate
+    # rows ranked per licence, plus the licences with no candidate at all
+    index = PlayerNameIndex(players)
+    rows = []
+    unmatched = []
+    for licence, person in sorted(missing.items()):
+        found = index.candidates(person['name'], person.get('club'), person.get('age_group'), season, limit, min_score)
+        if not found:
+            unmatched.append(licence)
+        for rank, (score, name_score, club_score, year_ok, player) in enumerate(found, 1):
+            rows.append({
+                'licence': licence,
+                'name': person['name'],
+                'club': person.get('club') or '',
+                'age_group': person.get('age_group') or '',
+                'rank': rank,
+                'score': round(score, 3),
+                'name_score': round(name_score, 3),
+                'club_score': round(club_score, 3),
+                'birth_year_ok': '' if year_ok is None else year_ok,
+                'player_id': player['id'],
+                'player_licence': player.get('license_id') or '',
+                'player_name': player.get('name') or '',
+                'player_club': player.get('club') or '',
+                'player_birth_date': player.get('birth_date') or '',
+            })
+    return rows, unmatched
+
+def write_candidates(path, rows):
+    # .json writes a list of objects; anything else is CSV
+    if path.endswith('.json'):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+        return
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CANDIDATE_COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
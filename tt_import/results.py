@@ -0,0 +1,95 @@
+from collections import namedtuple
+import pandas as pd
+from .paging import fetch_all
+
+# A result row is identified by the event, the player and the category played
+RESULT_KEY = ('event_id', 'player_id', 'category')
+
+ResultsDiff = namedtuple('ResultsDiff', ['inserts', 'updates', 'deletes', 'unchanged'])
+
+RESULT_COLUMNS = ['event_id', 'player_id', 'category', 'points', 'position']
+
+def build_results_frame(df, player_map, events):
+    # Columnar version of the per-row lookup: events are joined on
+    # (name, date) and players mapped by licence in one pass each.
+    # Returns the result frame and the players missing from the database.
+    df = df[df['Date'].notna() & (df['Licence ID'] != '') & (df['Licence ID'] != 'nan')]
+    event_ids = pd.DataFrame(
+        [(name, date, event_id) for (name, date), event_id in events.items()],
+        columns=['Competition Name', 'Date', 'event_id'],
+    )
+    df = df.merge(event_ids, on=['Competition Name', 'Date'], how='inner')
+    player_ids = df['Licence ID'].map(player_map)
+
+    missing = df[player_ids.isna()]
+    missing_players = set(missing['Name'].astype(str) + ' (' + missing['Licence ID'] + ')')
+
+    found = player_ids.notna()
+    results = pd.DataFrame({
+        'event_id': df['event_id'][found],
+        'player_id': player_ids[found],
+        'category': 'Egyes',
+        'points': df['Points'][found].astype(int),
+        'position': '-',
+    }, columns=RESULT_COLUMNS)
+    return results.reset_index(drop=True), missing_players
+
+def frame_records(frame):
+    # Much faster than DataFrame.to_dict('records'), and .tolist() yields
+    # plain Python values that serialize to JSON
+    columns = list(frame.columns)
+    return [dict(zip(columns, values)) for values in zip(*(frame[c].tolist() for c in columns))]
+
+def build_results(df, player_map, events):
+    # Returns the result rows to import and the players missing from the database
+    results, missing_players = build_results_frame(df, player_map, events)
+    return frame_records(results), missing_players
+
+def fetch_existing_results(supabase, event_ids, page_size=1000, events_per_query=100):
+    # Only the events touched by this import are compared, queried in chunks
+    # so the in.(...) filter stays within URL limits. Keyset-paged by id, so
+    # a PostgREST max-rows below page_size can't leave rows out of the diff
+    # to be inserted again.
+    event_ids = sorted(set(event_ids))
+    rows = []
+    for i in range(0, len(event_ids), events_per_query):
+        chunk = event_ids[i:i + events_per_query]
+        rows.extend(fetch_all(supabase, 'results', 'id, event_id, player_id, category, points, position',
+                              filters=[('in_', 'event_id', chunk)], page_size=page_size))
+    return rows
+
+EXISTING_COLUMNS = ['id', *RESULT_COLUMNS]
+
+def diff_frames(parsed, existing, categories=('Egyes',)):
+    # parsed is a result frame, existing the stored rows (with ids); the
+    # comparison is a single merge on RESULT_KEY
+    key = list(RESULT_KEY)
+    # Later rows win if the dataset or the database repeats a key
+    parsed = parsed.drop_duplicates(key, keep='last')
+    existing = pd.DataFrame(existing, columns=EXISTING_COLUMNS).drop_duplicates(key, keep='last')
+
+    merged = parsed.merge(existing, on=key, how='left', suffixes=('', '_db'))
+    new = merged['id'].isna()
+    changed = ~new & (merged['points'] != merged['points_db'])
+
+    inserts = frame_records(merged.loc[new, RESULT_COLUMNS])
+    # Keep the stored id and position, only the points change
+    updates = merged.loc[changed, ['id', 'event_id', 'player_id', 'category', 'points', 'position_db']]
+    updates = frame_records(updates.rename(columns={'position_db': 'position'})[EXISTING_COLUMNS])
+    unchanged = int((~new & ~changed).sum())
+
+    # Rows of the imported categories that are no longer in the dataset
+    gone = existing.merge(parsed[key], on=key, how='left', indicator=True)
+    gone = gone[(gone['_merge'] == 'left_only') & gone['category'].isin(categories)]
+    return ResultsDiff(inserts, updates, gone['id'].tolist(), unchanged)
+
+def describe_diff(diff):
+    return (f"{len(diff.inserts)} new, {len(diff.updates)} changed, "
+            f"{len(diff.deletes)} vanished, {diff.unchanged} unchanged")
+
+async def write_diff(writer, diff, delete_missing=False):
+    await writer.write('results', 'insert', diff.inserts)
+    # Updates carry the primary key, so an upsert rewrites them in place
+    await writer.write('results', 'upsert', diff.updates)
+    if delete_missing:
+        await writer.write('results', 'delete', diff.deletes)
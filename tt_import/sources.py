@@ -0,0 +1,40 @@
+import os
+import pandas as pd
+import detailed_points
+
+GENDERS = ('F', 'N')
+SOURCES = ('dataset', 'xlsx')
+
+def available_categories(dataset_dir=detailed_points.DATASET_DIR):
+    # Age categories that have both genders extracted
+    return [cat for cat in detailed_points.list_age_categories(dataset_dir)
+            if all(detailed_points.has_category(f"{cat}{g}", dataset_dir) for g in GENDERS)]
+
+def read_gender(cat, gender, source, dataset_dir):
+    if source == 'dataset':
+        if not detailed_points.has_category(f"{cat}{gender}", dataset_dir):
+            return None
+        return detailed_points.read_detailed_points(cat, gender, dataset_dir)
+
+    # Optional XLSX export written by extract_detailed_points.py --xlsx
+    path = os.path.join(os.path.dirname(dataset_dir), f"{cat}{gender}_detailed_points.xlsx")
+    if not os.path.exists(path):
+        return None
+    return pd.read_excel(path)
+
+def load_category(cat, source='dataset', dataset_dir=detailed_points.DATASET_DIR):
+    frames = []
+    for gender in GENDERS:
+        df = read_gender(cat, gender, source, dataset_dir)
+        if df is None:
+            return None
+        frames.append(df)
+
+    df = pd.concat(frames, ignore_index=True)
+    # Filter out dummy 'No tournaments' entries
+    df = df[df['Competition Name'] != 'No tournaments'].copy()
+    # Events are keyed by ISO date strings and licences are compared as text
+    df['Date'] = pd.to_datetime(df['Date']).dt.strftime('%Y-%m-%d')
+    df['Competition Name'] = df['Competition Name'].str.strip()
+    df['Licence ID'] = df['Licence ID'].astype(str).str.strip()
+    return df
@@ -0,0 +1,152 @@
+import cProfile
+import functools
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+def peak_rss_mb():
+    # High-water mark of the whole process so far; ru_maxrss is KiB on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round((rss if sys.platform == 'darwin' else rss * 1024) / 2**20, 1)
+
+def current_rss_mb():
+    # Resident set size right now; only Linux exposes it without psutil
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round(pages * os.sysconf('SC_PAGE_SIZE') / 2**20, 1)
+
+def cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+def call_measured(fn, *args):
+    # Runs fn in a worker process and returns its result with the CPU time it
+    # took and the worker's peak RSS, for StageTimer.add_worker_usage; the
+    # parent's own rusage never sees pool workers, which outlive the stage
+    start = cpu_seconds()
+    result = fn(*args)
+    return result, {'cpu_seconds': cpu_seconds() - start, 'peak_rss_mb': peak_rss_mb()}
+
+class StageTimer:
+    """Collects wall-clock time, CPU time, row counts and memory for each pipeline stage.
+
+    Memory is per stage: how much resident memory changed over it, and by how
+    much it raised the process's high-water mark. Work done in worker
+    processes is added by the stage with add_worker_usage.
+
+    With log_path set every finished stage is also appended there as a JSON
+    line ('-' for stdout), so runs can be compared and graphed later.
+    """
+
+    def __init__(self, log_path=None):
+        self.stages = []
+        self.log_path = log_path
+        # python -m tt_import runs tt_import/__main__.py
+        script = sys.argv[0] or 'python'
+        self.script = os.path.basename(os.path.dirname(script) if script.endswith('__main__.py') else script)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name, **fields):
+        # fields, e.g. category='U15F', are kept on the record and in the log.
+        # CPU time and memory are the whole process's, so stages running side
+        # by side in threads each see the others' share too.
+        record = {'stage': name, **fields, 'rows': None, 'seconds': 0.0, 'cpu_seconds': 0.0,
+                  'worker_cpu_seconds': 0.0, 'worker_peak_rss_mb': None}
+        start = time.perf_counter()
+        start_cpu = time.process_time()
+        start_rss = current_rss_mb()
+        start_peak = peak_rss_mb()
+        try:
+            yield record
+        finally:
+            record['seconds'] = time.perf_counter() - start
+            record['cpu_seconds'] = time.process_time() - start_cpu
+            end_rss = current_rss_mb()
+            record['rss_delta_mb'] = round(end_rss - start_rss, 1) if end_rss is not None and start_rss is not None else None
+            record['peak_rss_growth_mb'] = round(peak_rss_mb() - start_peak, 1)
+            with self._lock:
+                self.stages.append(record)
+                if self.log_path:
+                    self._log(record)
+
+    @staticmethod
+    def add_worker_usage(record, usage):
+        # usage as returned by call_measured
+        record['worker_cpu_seconds'] += usage['cpu_seconds']
+        record['worker_peak_rss_mb'] = max(record['worker_peak_rss_mb'] or 0.0, usage['peak_rss_mb'])
+
+    def timed(self, name, rows=None):
+        # Decorator form of stage(); rows(result) fills in the row count
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.stage(name) as record:
+                    result = fn(*args, **kwargs)
+                    if rows is not None:
+                        record['rows'] = rows(result)
+                    return result
+            return wrapper
+        return decorate
+
+    def _log(self, record):
+        line = json.dumps({'script': self.script, 'pid': os.getpid(), 'time': round(time.time(), 3),
+                           **{k: round(v, 4) if isinstance(v, float) else v for k, v in record.items()}},
+                          ensure_ascii=False)
+        if self.log_path == '-':
+            print(line, flush=True)
+            return
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+    def report(self):
+        lines = ["--- Stage timings ---",
+                 f"{'stage':<28} {'wall':>9} {'cpu':>9} {'workers':>9} {'RSS +/-':>11} {'peak +':>11}"]
+        for record in self.stages:
+            label = record['stage'] + (f" [{record['category']}]" if record.get('category') else "")
+            rows = f" ({record['rows']} rows)" if record['rows'] is not None else ""
+            rss = f"{record['rss_delta_mb']:+8.1f} MB" if record['rss_delta_mb'] is not None else f"{'-':>11}"
+            lines.append(f"{label:<28} {record['seconds']:8.2f}s {record['cpu_seconds']:8.2f}s "
+                         f"{record['worker_cpu_seconds']:8.2f}s {rss} {record['peak_rss_growth_mb']:+8.1f} MB{rows}")
+        lines.append(f"{'total':<28} {sum(r['seconds'] for r in self.stages):8.2f}s")
+        return "\n".join(lines)
+
+def add_timing_arguments(parser):
+    parser.add_argument('--timings', default=None, help="Append a JSON line per stage (wall and CPU time, worker CPU, rows, memory) to this file, '-' for stdout")
+    parser.add_argument('--profile', default=None, help="Profile the whole run into this file: a .html path writes a pyinstrument report, anything else a cProfile dump for pstats")
+
+@contextmanager
+def profiled(path):
+    # cProfile follows every thread from Python 3.12 on, only the main thread
+    # before that; pyinstrument samples the main thread. Worker processes are
+    # not profiled, so run the extraction with -j 1 to see inside the PDF parsing.
+    if not path:
+        yield
+        return
+    if path.endswith('.html'):
+        from pyinstrument import Profiler
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(profiler.output_html())
+            print(f"Wrote profile to {path}")
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        print(f"Wrote profile to {path} (python -m pstats {path})")
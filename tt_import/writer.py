@@ -0,0 +1,172 @@
+import asyncio
+import json
+import random
+import time
+import httpx
+from postgrest.exceptions import APIError
+from postgrest.types import ReturnMethod
+
+# Postgres / PostgREST error codes worth retrying: connection problems,
+# overload and serialization failures.
+TRANSIENT_CODES = {
+    'PGRST000', 'PGRST001', 'PGRST002', 'PGRST003',
+    '08000', '08003', '08006', '40001', '40P01', '53300', '57P01', '57P03',
+}
+TRANSIENT_STATUS = {408, 429, 500, 502, 503, 504}
+
+# Errors about the rows themselves: data exceptions (22xxx) and integrity
+# constraint violations (23xxx). Only these are worth splitting a batch for;
+# anything else (401/403, 42501 permission denied, a missing table or column,
+# PGRST1xx/3xx request and schema errors) fails every row the same way.
+DATA_CODE_CLASSES = ('22', '23')
+DATA_STATUS = {409}
+
+# Deletes send ids in the query string, so they are capped to stay within URL limits
+MAX_BATCH_SIZE_BY_OP = {'insert': None, 'upsert': None, 'delete': 100}
+
+def is_transient(error):
+    if isinstance(error, (httpx.TransportError, asyncio.TimeoutError)):
+        return True
+    if isinstance(error, APIError):
+        code = error.code
+        # Errors without a JSON body carry the HTTP status as the code
+        if isinstance(code, int) or (isinstance(code, str) and code.isdigit() and len(code) == 3):
+            return int(code) in TRANSIENT_STATUS
+        return code in TRANSIENT_CODES
+    return False
+
+def is_data_error(error):
+    if not isinstance(error, APIError):
+        return False
+    code = error.code
+    if isinstance(code, int) or (isinstance(code, str) and code.isdigit() and len(code) == 3):
+        return int(code) in DATA_STATUS
+    return isinstance(code, str) and len(code) == 5 and code.startswith(DATA_CODE_CLASSES)
+
+class FatalWriteError(Exception):
+    """A batch failed for a reason no row can fix, e.g. auth, a missing table or an outage outlasting the retries."""
+
+class WriterStats:
+    def __init__(self):
+        self.batches = 0
+        self.rows_written = 0
+        self.rows_rejected = 0
+        self.retries = 0
+        self.bytes_sent = 0
+
+    def summary(self, batch_size):
+        return (f"Writer: {self.rows_written} rows in {self.batches} batches, {self.rows_rejected} rejected, "
+                f"{self.retries} retries, {self.bytes_sent} bytes sent, final batch size {batch_size}")
+
+class BatchWriter:
+    """Writes rows through PostgREST with a bounded number of batches in flight.
+
+    The batch size grows while batches come back faster than target_latency
+    and halves when they are slower, and is always capped so one request
+    stays under max_payload_bytes. Transient errors are retried with
+    exponential backoff; a batch the database rejects for its data is split
+    until the offending rows are isolated, and those rows go to the
+    dead-letter file. Any other error, or a transient one still there after
+    max_retries, raises FatalWriteError and stops the remaining batches.
+    """
+
+    def __init__(self, client, max_in_flight=4, batch_size=500, min_batch_size=25, max_batch_size=5000,
+                 target_latency=1.0, max_payload_bytes=2_000_000, max_retries=5, backoff=0.5,
+                 dead_letter_path=None):
+        self.client = client
+        self.max_in_flight = max_in_flight
+        self.batch_size = batch_size
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.target_latency = target_latency
+        self.max_payload_bytes = max_payload_bytes
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.dead_letter_path = dead_letter_path
+        self.stats = WriterStats()
+        self.fatal = None
+
+    async def write(self, table, op, rows):
+        slots = asyncio.Semaphore(self.max_in_flight)
+        tasks = []
+        i = 0
+        while i < len(rows) and self.fatal is None:
+            # The size is decided when a slot frees up, so it follows the latest latency
+            await slots.acquire()
+            size = self.batch_size
+            if MAX_BATCH_SIZE_BY_OP[op]:
+                size = min(size, MAX_BATCH_SIZE_BY_OP[op])
+            batch = rows[i:i + size]
+            i += size
+            task = asyncio.create_task(self._send(table, op, batch))
+            task.add_done_callback(lambda _: slots.release())
+            tasks.append(task)
+        try:
+            await asyncio.gather(*tasks)
+        except FatalWriteError:
+            for task in tasks:
+                task.cancel()
+            raise
+        if self.fatal is not None:
+            raise self.fatal
+
+    async def _execute(self, table, op, batch):
+        query = self.client.table(table)
+        if op == 'insert':
+            query = query.insert(batch, returning=ReturnMethod.minimal)
+        elif op == 'upsert':
+            query = query.upsert(batch, returning=ReturnMethod.minimal)
+        elif op == 'delete':
+            query = query.delete(returning=ReturnMethod.minimal).in_('id', batch)
+        else:
+            raise ValueError(f"Unknown write operation: {op}")
+        await query.execute()
+
+    async def _send(self, table, op, batch):
+        payload_bytes = len(json.dumps(batch, default=str).encode('utf-8'))
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                await self._execute(table, op, batch)
+            except Exception as e:
+                transient = is_transient(e)
+                if transient and attempt < self.max_retries:
+                    self.stats.retries += 1
+                    await asyncio.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random()))
+                    continue
+                # Only rows the database rejects are set aside; a transient
+                # error that outlasts the retries stops the run like any other
+                if not is_data_error(e):
+                    if self.fatal is None:
+                        reason = f"still failing after {self.max_retries} retries" if transient else "failed"
+                        self.fatal = FatalWriteError(f"{op} into {table} {reason}: {e}")
+                    raise self.fatal from e
+                if len(batch) > 1:
+                    mid = len(batch) // 2
+                    await self._send(table, op, batch[:mid])
+                    await self._send(table, op, batch[mid:])
+                    return
+                self._dead_letter(table, op, batch, e)
+                return
+
+            self.stats.batches += 1
+            self.stats.rows_written += len(batch)
+            self.stats.bytes_sent += payload_bytes
+            self._adapt(len(batch), time.perf_counter() - start, payload_bytes)
+            return
+
+    def _adapt(self, rows, seconds, payload_bytes):
+        if seconds > self.target_latency:
+            self.batch_size = max(self.min_batch_size, self.batch_size // 2)
+        elif seconds < self.target_latency / 2:
+            self.batch_size = min(self.max_batch_size, int(self.batch_size * 1.5) + 1)
+        bytes_per_row = payload_bytes / max(rows, 1)
+        self.batch_size = max(1, min(self.batch_size, int(self.max_payload_bytes / max(bytes_per_row, 1))))
+
+    def _dead_letter(self, table, op, batch, error):
+        self.stats.rows_rejected += len(batch)
+        if not self.dead_letter_path:
+            return
+        with open(self.dead_letter_path, 'a', encoding='utf-8') as f:
+            for row in batch:
+                f.write(json.dumps({'table': table, 'op': op, 'row': row, 'error': str(error)}, ensure_ascii=False, default=str) + '\n')
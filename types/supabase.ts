@@ -59,6 +59,47 @@ export type Database = {
         }
         Relationships: []
       }
+      player_ranking_state: {
+        Row: {
+          age_category: string
+          as_of: string
+          event_points: Json
+          events_count: number
+          gender: string | null
+          player_id: string
+          total_points: number
+          updated_at: string
+        }
+        Insert: {
+          age_category: string
+          as_of: string
+          event_points: Json
+          events_count: number
+          gender?: string | null
+          player_id: string
+          total_points: number
+          updated_at?: string
+        }
+        Update: {
+          age_category?: string
+          as_of?: string
+          event_points?: Json
+          events_count?: number
+          gender?: string | null
+          player_id?: string
+          total_points?: number
+          updated_at?: string
+        }
+        Relationships: [
+          {
+            foreignKeyName: "player_ranking_state_player_id_fkey"
+            columns: ["player_id"]
+            isOneToOne: false
+            referencedRelation: "players"
+            referencedColumns: ["id"]
+          },
+        ]
+      }
       players: {
         Row: {
           birth_date: string | null
@@ -137,6 +178,24 @@ export type Database = {
         }
         Relationships: []
       }
+      ranking_rules: {
+        Row: {
+          id: boolean
+          max_events: number
+          type_limits: Json
+        }
+        Insert: {
+          id?: boolean
+          max_events: number
+          type_limits?: Json
+        }
+        Update: {
+          id?: boolean
+          max_events?: number
+          type_limits?: Json
+        }
+        Relationships: []
+      }
       ranking_snapshots: {
         Row: {
           created_at: string | null
@@ -175,6 +234,30 @@ export type Database = {
           },
         ]
       }
+      ranking_state_runs: {
+        Row: {
+          as_of: string
+          expired_events: number
+          id: number
+          ran_at: string
+          refreshed_players: number
+        }
+        Insert: {
+          as_of: string
+          expired_events?: number
+          id?: number
+          ran_at?: string
+          refreshed_players?: number
+        }
+        Update: {
+          as_of?: string
+          expired_events?: number
+          id?: number
+          ran_at?: string
+          refreshed_players?: number
+        }
+        Relationships: []
+      }
       results: {
         Row: {
           category: string
@@ -228,7 +311,86 @@ export type Database = {
       [_ in never]: never
     }
     Functions: {
-      [_ in never]: never
+      expire_player_ranking_state: {
+        Args: {
+          p_today?: string
+        }
+        Returns: {
+          expired_events: number
+          from_date: string
+          refreshed_players: number
+          to_date: string
+        }[]
+      }
+      get_current_rankings: {
+        Args: {
+          p_age_category?: string | null
+          p_age_limit?: boolean
+          p_gender?: string | null
+        }
+        Returns: {
+          birth_date: string | null
+          club: string | null
+          club_id: string | null
+          club_name: string | null
+          events_count: number
+          gender: string
+          player_id: string
+          player_name: string
+          rank_position: number
+          total_points: number
+        }[]
+      }
+      get_rankings: {
+        Args: {
+          p_age_category?: string | null
+          p_age_limit?: boolean
+          p_as_of?: string
+          p_gender?: string | null
+        }
+        Returns: {
+          birth_date: string | null
+          club: string | null
+          club_id: string | null
+          club_name: string | null
+          events_count: number
+          gender: string
+          player_id: string
+          player_name: string
+          rank_position: number
+          total_points: number
+        }[]
+      }
+      ranked_player_events: {
+        Args: {
+          p_age_category?: string | null
+          p_age_limit?: boolean
+          p_as_of: string
+          p_by_category?: boolean
+          p_gender?: string | null
+          p_player_ids?: string[] | null
+        }
+        Returns: {
+          age_category: string
+          counted: boolean
+          event_id: string
+          player_id: string
+          points: number
+          type: string
+          validity_date: string
+        }[]
+      }
+      ranking_state_as_of: {
+        Args: Record<PropertyKey, never>
+        Returns: string
+      }
+      refresh_player_ranking_state: {
+        Args: {
+          p_as_of?: string
+          p_player_ids: string[]
+        }
+        Returns: number
+      }
     }
     Enums: {
       [_ in never]: never
@@ -1,4 +1,5 @@
 import { createClient } from './supabase/server'
+import { PAGE_SIZE, fetchAllPages } from './paging'
 
 export async function generateSnapshotCsv(snapshotMetadataId: string): Promise<string> {
   const supabase = await createClient()
@@ -14,8 +15,8 @@ export async function generateSnapshotCsv(snapshotMetadataId: string): Promise<s
     throw new Error('Snapshot metadata not found')
   }
 
-  // Fetch ranking data
-  const { data: rankings } = await supabase
+  // Fetch ranking data, paged by rank so long lists are exported in full
+  const rankings = await fetchAllPages<any, 'rank_position'>(after => supabase
     .from('ranking_snapshots')
     .select(`
       rank_position,
@@ -24,9 +25,11 @@ export async function generateSnapshotCsv(snapshotMetadataId: string): Promise<s
       player:players (license_id, name, club, gender, birth_date)
     `)
     .eq('metadata_id', snapshotMetadataId)
+    .gt('rank_position', after ?? 0)
     .order('rank_position', { ascending: true })
+    .limit(PAGE_SIZE), 'rank_position')
 
-  if (!rankings || rankings.length === 0) {
+  if (rankings.length === 0) {
     return ''
   }
 
@@ -0,0 +1,33 @@
+export const PAGE_SIZE = 1000
+
+type Page<T> = PromiseLike<{ data: T[] | null; error: unknown }>
+
+/**
+ * Keyset paging: runs query(after) with the key of the last row seen until a
+ * page comes back empty, handing each page to onPage as it arrives. The query
+ * must filter on key > after (when after is not null), order by key and
+ * limit to PAGE_SIZE. Stopping only on an empty page means a PostgREST
+ * max-rows setting below PAGE_SIZE cannot silently cut the result short.
+ */
+export async function forEachPage<T, K extends keyof T>(
+  query: (after: T[K] | null) => Page<T>,
+  key: K,
+  onPage: (rows: T[]) => void
+): Promise<void> {
+  let after: T[K] | null = null
+  for (;;) {
+    const { data, error } = await query(after)
+    if (error) throw error
+    if (!data || data.length === 0) return
+    onPage(data)
+    after = data[data.length - 1][key]
+  }
+}
+
+export async function fetchAllPages<T, K extends keyof T>(query: (after: T[K] | null) => Page<T>, key: K): Promise<T[]> {
+  const rows: T[] = []
+  await forEachPage(query, key, page => {
+    rows.push(...page)
+  })
+  return rows
+}
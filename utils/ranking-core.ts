@@ -0,0 +1,159 @@
+// Pure ranking core: plain arrays in, ranked players out, no database access.
+// The rules are passed in; the database keeps them in the ranking_rules table,
+// which get_rankings and refresh_player_ranking_state read through
+// ranked_player_events. scripts/check_rankings.js holds the SQL and this core
+// against the JavaScript ranking they replaced (scripts/reference-ranking.js)
+// on real data, and scripts/check_ranking_core.js holds this core against it
+// on random seasons.
+
+// The columns of a ranking_rules row
+export type RankingRules = {
+  // Events counted per player
+  maxEvents: number
+  // At most this many events of a type count, e.g. two "II. osztály"
+  typeLimits: Record<string, number>
+}
+
+// One entry per result (or per player and event, already summed), by column
+export type ResultColumns = {
+  playerIds: ArrayLike<string>
+  eventIds: ArrayLike<string>
+  eventTypes: ArrayLike<string | null>
+  points: ArrayLike<number>
+}
+
+export type RankedAggregate = {
+  rankPosition: number
+  playerId: string
+  totalPoints: number
+  eventsCount: number
+}
+
+// Keeps buf[0..len) sorted in descending order, at most buf.length values;
+// returns the new length
+function keepTop(buf: Float64Array, len: number, value: number): number {
+  if (len === buf.length) {
+    if (len === 0 || value <= buf[len - 1]) return len
+    len--
+  }
+  let i = len
+  while (i > 0 && buf[i - 1] < value) {
+    buf[i] = buf[i - 1]
+    i--
+  }
+  buf[i] = value
+  return len + 1
+}
+
+/**
+ * Ranks players by the sum of their best events. Points are summed per
+ * player and event first (Egyes, Páros, Vegyes and Csapat of one event count
+ * as one), then each player keeps the rules.maxEvents best events with no
+ * more than rules.typeLimits[type] of a type. Ties in total points are
+ * ordered by player id. Filtering by gender, category or age is left to the
+ * caller.
+ */
+export function rankResults(columns: ResultColumns, rules: RankingRules): RankedAggregate[] {
+  const { playerIds, eventIds, eventTypes, points } = columns
+  const rowCount = points.length
+  const limitedTypes = Object.keys(rules.typeLimits)
+
+  // Dense indexes for players and events; an event's type is taken from its
+  // first result, as a limited type index or -1
+  const playerIndex = new Map<string, number>()
+  const players: string[] = []
+  const eventIndex = new Map<string, number>()
+  const eventLimit: number[] = []
+  const rowPlayer = new Int32Array(rowCount)
+  const rowEvent = new Int32Array(rowCount)
+  for (let i = 0; i < rowCount; i++) {
+    let p = playerIndex.get(playerIds[i])
+    if (p === undefined) {
+      p = players.length
+      playerIndex.set(playerIds[i], p)
+      players.push(playerIds[i])
+    }
+    let e = eventIndex.get(eventIds[i])
+    if (e === undefined) {
+      e = eventLimit.length
+      eventIndex.set(eventIds[i], e)
+      const type = eventTypes[i]
+      eventLimit.push(type === null ? -1 : limitedTypes.indexOf(type))
+    }
+    rowPlayer[i] = p
+    rowEvent[i] = e
+  }
+
+  // Points per player and event
+  const eventCount = eventLimit.length
+  const pairIndex = new Map<number, number>()
+  const pairPlayer: number[] = []
+  const pairEvent: number[] = []
+  const pairPoints: number[] = []
+  for (let i = 0; i < rowCount; i++) {
+    const key = rowPlayer[i] * eventCount + rowEvent[i]
+    const k = pairIndex.get(key)
+    if (k === undefined) {
+      pairIndex.set(key, pairPoints.length)
+      pairPlayer.push(rowPlayer[i])
+      pairEvent.push(rowEvent[i])
+      pairPoints.push(points[i])
+    } else {
+      pairPoints[k] += points[i]
+    }
+  }
+
+  // Each player's events next to each other: pairs of player p are
+  // order[start[p]..start[p + 1])
+  const start = new Int32Array(players.length + 1)
+  for (let k = 0; k < pairPlayer.length; k++) start[pairPlayer[k] + 1]++
+  for (let p = 0; p < players.length; p++) start[p + 1] += start[p]
+  const fill = start.slice(0, players.length)
+  const order = new Int32Array(pairPlayer.length)
+  for (let k = 0; k < pairPlayer.length; k++) order[fill[pairPlayer[k]]++] = k
+
+  // Partial selection: the best events of unlimited types and the best few of
+  // each limited type are the only ones that can count, so each player needs
+  // a handful of small sorted buffers instead of a sort of all their events
+  const maxEvents = rules.maxEvents
+  const best = new Float64Array(maxEvents)
+  const typeBest = limitedTypes.map(type => new Float64Array(Math.max(0, Math.min(rules.typeLimits[type], maxEvents))))
+  const typeLen = new Int32Array(limitedTypes.length)
+  const counted = new Float64Array(maxEvents)
+
+  const totals = new Float64Array(players.length)
+  const counts = new Int32Array(players.length)
+  for (let p = 0; p < players.length; p++) {
+    let bestLen = 0
+    typeLen.fill(0)
+    for (let j = start[p]; j < start[p + 1]; j++) {
+      const k = order[j]
+      const t = eventLimit[pairEvent[k]]
+      if (t < 0) bestLen = keepTop(best, bestLen, pairPoints[k])
+      else typeLen[t] = keepTop(typeBest[t], typeLen[t], pairPoints[k])
+    }
+
+    let countedLen = 0
+    for (let j = 0; j < bestLen; j++) countedLen = keepTop(counted, countedLen, best[j])
+    for (let t = 0; t < typeBest.length; t++) {
+      for (let j = 0; j < typeLen[t]; j++) countedLen = keepTop(counted, countedLen, typeBest[t][j])
+    }
+    let total = 0
+    for (let j = 0; j < countedLen; j++) total += counted[j]
+    totals[p] = total
+    counts[p] = countedLen
+  }
+
+  const ranked: number[] = []
+  for (let p = 0; p < players.length; p++) {
+    if (counts[p] > 0) ranked.push(p)
+  }
+  ranked.sort((a, b) => totals[b] - totals[a] || (players[a] < players[b] ? -1 : players[a] > players[b] ? 1 : 0))
+
+  return ranked.map((p, index) => ({
+    rankPosition: index + 1,
+    playerId: players[p],
+    totalPoints: totals[p],
+    eventsCount: counts[p],
+  }))
+}
@@ -1,4 +1,6 @@
 import { createClient } from './supabase/server'
+import { PAGE_SIZE, fetchAllPages } from './paging'
+import { RankedRow, fetchRankedRows } from './ranking'
 
 export interface RankingEntry {
   playerId: string
@@ -199,17 +201,26 @@ export async function getRankingsWithHistory(gender?: string, ageCategory?: stri
 
   if (!meta) return []
 
-  const { data: latestData } = await supabase
-    .from('ranking_snapshots')
-    .select(`
-      player_id,
-      total_points,
-      events_count,
-      player:players!inner (id, name, gender, club_id, clubs(name), birth_date)
-    `)
-    .eq('metadata_id', meta.id)
-
-  if (!latestData) return []
+  // Paged by player_id: a snapshot can hold more players than one response
+  let latestData: any[]
+  try {
+    latestData = await fetchAllPages<any, 'player_id'>(after => {
+      let query = supabase
+        .from('ranking_snapshots')
+        .select(`
+          player_id,
+          total_points,
+          events_count,
+          player:players!inner (id, name, gender, club_id, clubs(name), birth_date)
+        `)
+        .eq('metadata_id', meta.id)
+      if (after !== null) query = query.gt('player_id', after)
+      return query.order('player_id').limit(PAGE_SIZE)
+    }, 'player_id')
+  } catch (error) {
+    console.error('Error fetching ranking snapshot:', error)
+    return []
+  }
 
   let currentEntries = latestData.map((s: any) => ({
     playerId: s.player_id,
@@ -251,17 +262,22 @@ export async function getRankingsWithHistory(gender?: string, ageCategory?: stri
         .single()
         
     if (prevMeta) {
-        const { data: prevData } = await supabase
-        .from('ranking_snapshots')
-        .select(`player_id, rank_position`)
-        .eq('metadata_id', prevMeta.id)
-
-        if (prevData) {
-            previousEntries = prevData.map((e: any) => ({
-                playerId: e.player_id,
-                rankPosition: e.rank_position
-            })) as any
-        }
+        const prevData = await fetchAllPages<any, 'player_id'>(after => {
+            let query = supabase
+            .from('ranking_snapshots')
+            .select(`player_id, rank_position`)
+            .eq('metadata_id', prevMeta.id)
+            if (after !== null) query = query.gt('player_id', after)
+            return query.order('player_id').limit(PAGE_SIZE)
+        }, 'player_id').catch(error => {
+            console.error('Error fetching previous ranking snapshot:', error)
+            return []
+        })
+
+        previousEntries = prevData.map((e: any) => ({
+            playerId: e.player_id,
+            rankPosition: e.rank_position
+        })) as any
     }
   }
 
@@ -321,105 +337,29 @@ export async function getPlayerRankingHistory(playerId: string): Promise<any[]>
  */
 async function getRankingsForSnapshot(gender?: string, ageCategory?: string): Promise<RankingEntry[]> {
   const supabase = await createClient()
-  const today = new Date().toISOString()
 
-  // 1. Fetch all results from valid events join with players and events
-  const { data, error } = await supabase
-    .from('results')
-    .select(`
-      points,
-      category,
-      player:players!inner (id, name, gender, club_id, clubs(name), birth_date),
-      event:events!inner (id, type, date, validity_date, age_category)
-    `)
-    .gte('event.validity_date', today)
-  
-  if (error || !data) {
+  // Read from player_ranking_state by get_current_rankings. p_age_limit drops
+  // players too old for a U category (e.g. 16 in U15); players without a
+  // birth date are kept, as requested.
+  let data: RankedRow[]
+  try {
+    data = await fetchRankedRows(supabase, {
+      p_gender: gender ?? null,
+      p_age_category: ageCategory ?? null,
+      p_age_limit: true,
+    })
+  } catch (error) {
     console.error('Error fetching rankings for snapshot:', error)
     return []
   }
 
-  // 2. Parse max age from category (e.g., 'U15' -> 15)
-  const isUCategory = ageCategory && ageCategory !== 'Senior' && ageCategory.startsWith('U');
-  const maxAllowedAge = isUCategory ? parseInt(ageCategory.replace('U', ''), 10) : null;
-  const currentYear = new Date().getFullYear();
-
-  // 3. Group by player
-  const playerGroups = new Map<string, any[]>()
-  data.forEach((r: any) => {
-    // Filter by gender if provided
-    if (gender && r.player.gender !== gender) return
-    // Filter by age category from the EVENT constraints
-    if (ageCategory && r.event.age_category !== ageCategory) return
-
-    // Apply ranking generation age limits
-    if (isUCategory && maxAllowedAge !== null) {
-        if (r.player.birth_date) {
-            const birthYear = new Date(r.player.birth_date).getFullYear()
-            const playerAge = currentYear - birthYear;
-            // E.g. for U15, if age is 16, they should NOT be included in this specific list
-            if (playerAge > maxAllowedAge) {
-                return; // Skip this player's result for THIS ranking
-            }
-        }
-        // If birth_date is missing, the user requested to INCUDE them by default
-    }
-
-    if (!playerGroups.has(r.player.id)) {
-      playerGroups.set(r.player.id, [])
-    }
-    playerGroups.get(r.player.id)?.push(r)
-  })
-
-  // 4. Process each player's results
-  const rankingEntries: RankingEntry[] = []
-
-  playerGroups.forEach((results, playerId) => {
-    const player = results[0].player
-
-    // A. Group by event to sum points across categories
-    const eventGroups = new Map<string, { totalPoints: number, type: string, date: string }>()
-    
-    results.forEach(r => {
-      const existing = eventGroups.get(r.event.id) || { totalPoints: 0, type: r.event.type, date: r.event.date }
-      existing.totalPoints += r.points
-      eventGroups.set(r.event.id, existing)
-    })
-
-    // B. Sort events by points descending
-    const sortedEvents = Array.from(eventGroups.values())
-      .sort((a, b) => b.totalPoints - a.totalPoints)
-
-    // C. Apply Top 6 / II. osztály rules
-    let totalPoints = 0
-    let eventsCount = 0
-    let iiOsztalyCount = 0
-
-    for (const event of sortedEvents) {
-      if (eventsCount >= 6) break
-
-      if (event.type === 'II. osztály') {
-        if (iiOsztalyCount < 2) {
-          totalPoints += event.totalPoints
-          eventsCount++
-          iiOsztalyCount++
-        }
-      } else {
-        totalPoints += event.totalPoints
-        eventsCount++
-      }
-    }
-
-    rankingEntries.push({
-      playerId: player.id,
-      playerName: player.name,
-      clubId: player.club_id,
-      club: player.clubs?.name,
-      gender: player.gender,
-      totalPoints,
-      eventsCount
-    })
-  })
-
-  return rankingEntries.sort((a, b) => b.totalPoints - a.totalPoints)
+  return data.map(r => ({
+    playerId: r.player_id,
+    playerName: r.player_name,
+    clubId: r.club_id,
+    club: r.club_name,
+    gender: r.gender,
+    totalPoints: r.total_points,
+    eventsCount: r.events_count
+  }))
 }
@@ -1,4 +1,5 @@
 import { createClient } from './supabase/server'
+import { PAGE_SIZE, fetchAllPages } from './paging'
 
 export type RankingEntry = {
   playerId: string
@@ -9,91 +10,64 @@ export type RankingEntry = {
   eventsCount: number
 }
 
+// A row of the get_current_rankings / get_rankings database functions
+export type RankedRow = {
+  rank_position: number
+  player_id: string
+  player_name: string
+  gender: string
+  club: string | null
+  club_id: string | null
+  club_name: string | null
+  birth_date: string | null
+  total_points: number
+  events_count: number
+}
+
+type SupabaseClient = Awaited<ReturnType<typeof createClient>>
+
+/**
+ * Current standings in rank order, read from player_ranking_state (kept up
+ * to date by triggers on results) by get_current_rankings. Keyset-paged on
+ * rank_position, so a ranking longer than the PostgREST max-rows setting
+ * comes back complete.
+ */
+export async function fetchRankedRows(
+  supabase: SupabaseClient,
+  params: { p_gender: string | null; p_age_category: string | null; p_age_limit?: boolean }
+): Promise<RankedRow[]> {
+  return fetchAllPages<RankedRow, 'rank_position'>(
+    after => supabase
+      .rpc('get_current_rankings', params)
+      .gt('rank_position', after ?? 0)
+      .order('rank_position')
+      .limit(PAGE_SIZE),
+    'rank_position'
+  )
+}
+
 export async function getRankings(gender?: string, ageCategory?: string): Promise<RankingEntry[]> {
   const supabase = await createClient()
-  const today = new Date().toISOString()
 
-  // 1. Fetch all results from valid events join with players and events
-  const { data, error } = await supabase
-    .from('results')
-    .select(`
-      points,
-      category,
-      player:players!inner (id, name, gender, club, birth_date),
-      event:events!inner (id, type, date, validity_date, age_category)
-    `)
-    .gte('event.validity_date', today)
-  
-  if (error) {
+  // Per-event sums and the ranking_rules selection are maintained in
+  // player_ranking_state as results are written; only the ranked rows come back
+  let data: RankedRow[]
+  try {
+    data = await fetchRankedRows(supabase, {
+      p_gender: gender ?? null,
+      p_age_category: ageCategory ?? null,
+    })
+  } catch (error) {
     console.error('Error fetching rankings:', error)
     return []
   }
 
-  // 2. Group by player
-  const playerGroups = new Map<string, any[]>()
-  data.forEach((r: any) => {
-    // Filter by gender if provided
-    if (gender && r.player.gender !== gender) return
-    // Filter by age category if provided
-    if (ageCategory && r.event.age_category !== ageCategory) return
-
-    if (!playerGroups.has(r.player.id)) {
-      playerGroups.set(r.player.id, [])
-    }
-    playerGroups.get(r.player.id)?.push(r)
-  })
-
-  // 3. Process each player's results
-  const rankingEntries: RankingEntry[] = []
-
-  playerGroups.forEach((results, playerId) => {
-    const player = results[0].player
-
-    // Step A: Group by event to sum points across categories (Egyes + Páros + Vegyes)
-    const eventGroups = new Map<string, { totalPoints: number, type: string, date: string }>()
-    
-    results.forEach(r => {
-      const existing = eventGroups.get(r.event.id) || { totalPoints: 0, type: r.event.type, date: r.event.date }
-      existing.totalPoints += r.points
-      eventGroups.set(r.event.id, existing)
-    })
-
-    // Step B: Sort events by total points descending
-    const sortedEvents = Array.from(eventGroups.values())
-      .sort((a, b) => b.totalPoints - a.totalPoints)
-
-    // Step C: Apply ranking selection rules:
-    // - Top 6 events count total
-    // - Maximum 2 from "II. osztály" count
-    let totalPoints = 0
-    let eventsCount = 0
-    let iiOsztalyCount = 0
-
-    for (const event of sortedEvents) {
-      if (eventsCount >= 6) break
-
-      if (event.type === 'II. osztály') {
-        if (iiOsztalyCount < 2) {
-          totalPoints += event.totalPoints
-          eventsCount++
-          iiOsztalyCount++
-        }
-      } else {
-        totalPoints += event.totalPoints
-        eventsCount++
-      }
-    }
-
-    rankingEntries.push({
-      playerId: player.id,
-      name: player.name,
-      gender: player.gender,
-      club: player.club,
-      totalPoints,
-      eventsCount
-    })
-  })
-
-  // 4. Sort ranking by total points
-  return rankingEntries.sort((a, b) => b.totalPoints - a.totalPoints)
+  return data.map(r => ({
+    playerId: r.player_id,
+    name: r.player_name,
+    gender: r.gender,
+    club: r.club,
+    totalPoints: r.total_points,
+    eventsCount: r.events_count
+  }))
 }
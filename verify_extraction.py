@@ -1,33 +1,138 @@
-import pandas as pd
+import argparse
+import glob
+import json
 import os
+import sys
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import detailed_points
+import ranking_lists
+from tt_import.events import IMPORTED_EVENT_TYPE, RANKING_RULES
+from tt_import.timing import StageTimer, add_timing_arguments, profiled
+
+INPUT_DIR = "input/U15"
+
+def discover_categories(input_dir=INPUT_DIR):
+    # Every <cat>.csv ranking list, e.g. U11F or FelnőttN
+    names = (os.path.splitext(os.path.basename(p))[0] for p in glob.glob(os.path.join(input_dir, '*.csv')))
+    return sorted(unicodedata.normalize('NFC', n) for n in names if n[-1:] in ('F', 'N'))
+
+def ranked_totals(df, rules=RANKING_RULES):
+    # Per licence: first rank seen, number of tournament rows and the
+    # ranking total under the app's rules. Every extracted competition is
+    # typed the way the import creates its event.
+    df = df.sort_values(['Licence ID', 'Points'], ascending=[True, False], kind='stable')
+    tournaments = df['Competition Name'] != 'No tournaments'
+    by_player = df['Licence ID']
+    event_types = pd.Series(IMPORTED_EVENT_TYPE, index=df.index)
+    eligible = tournaments
+    for event_type, limit in rules['type_limits'].items():
+        is_type = tournaments & (event_types == event_type)
+        eligible = eligible & (~is_type | (is_type.astype(int).groupby(by_player).cumsum() <= limit))
+    counted = eligible & (eligible.astype(int).groupby(by_player).cumsum() <= rules['max_events'])
+    return pd.DataFrame({
+        'extracted_rank': df.groupby('Licence ID')['Rank'].first(),
+        'rows': tournaments.groupby(by_player).sum(),
+        'extracted_points': df['Points'].where(counted, 0).groupby(by_player).sum(),
+    })
+
+def verify_category(cat, input_dir=INPUT_DIR, dataset_dir=detailed_points.DATASET_DIR):
+    csv_path = os.path.join(input_dir, f"{cat}.csv")
+    if not os.path.exists(csv_path) or not detailed_points.has_category(cat, dataset_dir):
+        return {'category': cat, 'ok': False, 'error': "missing CSV or extracted dataset"}
+
+    ranking = ranking_lists.read_ranking_list(csv_path).to_pandas()
+    ranking = ranking[ranking[ranking_lists.LICENCE] != ''].set_index(ranking_lists.LICENCE)
+    expected = pd.DataFrame({
+        'name': ranking[ranking_lists.NAME],
+        'csv_rank': pd.to_numeric(ranking[ranking_lists.RANK], errors='coerce'),
+        'csv_points': pd.to_numeric(ranking[ranking_lists.POINTS], errors='coerce'),
+    })
+    df = detailed_points.read_detailed_points(*detailed_points.split_category(cat), dataset_dir=dataset_dir)
+    df['Licence ID'] = df['Licence ID'].astype(str).str.strip()
+    extracted = ranked_totals(df)
+
+    joined = expected.join(extracted, how='outer')
+    missing = joined['extracted_rank'].isna()
+    extra = joined['csv_rank'].isna()
+    both = ~missing & ~extra
+    rank_diff = both & (joined['csv_rank'] != joined['extracted_rank'])
+    point_diff = both & (joined['csv_points'] != joined['extracted_points'])
+
+    def records(mask, columns):
+        rows = joined.loc[mask, columns].reset_index(names='licence')
+        return json.loads(rows.to_json(orient='records', force_ascii=False))
+
+    report = {
+        'category': cat,
+        'csv_players': len(expected),
+        'extracted_players': int(len(extracted)),
+        'extracted_rows': int(extracted['rows'].sum()),
+        'missing_licences': records(missing, ['name']),
+        'extra_licences': records(extra, ['extracted_rank']),
+        'rank_mismatches': records(rank_diff, ['name', 'csv_rank', 'extracted_rank']),
+        'point_mismatches': records(point_diff, ['name', 'csv_points', 'extracted_points', 'rows']),
+    }
+    # The CSV totals follow rules the extraction can't see (the events' real
+    # types, same-day duplicates), so point differences are only reported;
+    # the licences and their ranks have to match
+    report['ok'] = not (missing.any() or extra.any() or rank_diff.any())
+    return report
+
+def verify_categories(categories, input_dir=INPUT_DIR, dataset_dir=detailed_points.DATASET_DIR, workers=None, timer=None):
+    timer = timer or StageTimer()
+
+    def verify(cat):
+        with timer.stage('verify', category=cat) as stage:
+            report = verify_category(cat, input_dir, dataset_dir)
+            stage['rows'] = report.get('extracted_rows')
+        return report
+
+    with ThreadPoolExecutor(max_workers=workers or min(len(categories), os.cpu_count() or 1) or 1) as pool:
+        return list(pool.map(verify, categories))
+
+def describe(report):
+    if 'error' in report:
+        return f"[{report['category']}] FAILED: {report['error']}"
+    status = "OK" if report['ok'] else "FAILED"
+    text = (f"[{report['category']}] {status}: {report['csv_players']} CSV players, "
+            f"{report['extracted_players']} extracted ({report['extracted_rows']} tournament rows); "
+            f"{len(report['missing_licences'])} missing, {len(report['extra_licences'])} extra, "
+            f"{len(report['rank_mismatches'])} rank mismatches")
+    if report['point_mismatches']:
+        text += f"\n  warning: {len(report['point_mismatches'])} point totals differ from the CSV"
+    return text
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the extracted dataset against the ranking list CSVs.")
+    parser.add_argument('categories', nargs='*', help="Categories to check, e.g. U11F FelnőttN (default: every CSV in the input directory)")
+    parser.add_argument('--input-dir', default=INPUT_DIR, help=f"Directory with the ranking list CSVs (default: {INPUT_DIR})")
+    parser.add_argument('--dataset-dir', default=detailed_points.DATASET_DIR, help=f"Extracted dataset directory (default: {detailed_points.DATASET_DIR})")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="Categories checked concurrently (default: CPU count)")
+    parser.add_argument('--output', default=None, help="Write the full diff as JSON to this file ('-' for stdout)")
+    add_timing_arguments(parser)
+    args = parser.parse_args()
+
+    categories = [unicodedata.normalize('NFC', c) for c in args.categories] or discover_categories(args.input_dir)
+    timer = StageTimer(args.timings)
+    with profiled(args.profile):
+        reports = verify_categories(categories, args.input_dir, args.dataset_dir, args.workers, timer)
+    out = sys.stderr if args.output == '-' else sys.stdout
+    for report in reports:
+        print(describe(report), file=out)
+    print(timer.report(), file=out)
+
+    if args.output:
+        text = json.dumps(reports, ensure_ascii=False, indent=2)
+        if args.output == '-':
+            print(text)
+        else:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(text + '\n')
+
+    # A non-zero exit lets scripts gate the import on a clean extraction
+    sys.exit(0 if all(r['ok'] for r in reports) else 1)
 
-categories = ['FelnőttN']
-
-for cat in categories:
-    csv_path = f"input/U15/{cat}.csv"
-    xlsx_path = f"input/U15/{cat}_detailed_points.xlsx"
-    
-    if not os.path.exists(csv_path) or not os.path.exists(xlsx_path):
-        print(f"[{cat}] Missing CSV or XLSX file.")
-        continue
-        
-    try:
-        df_csv = pd.read_csv(csv_path, sep=';')
-        csv_players = set(df_csv['Engedélyszám'].astype(str).str.strip())
-        # Filter out empty strings if any
-        csv_players = {p for p in csv_players if p and p != 'nan'}
-        
-        df_xlsx = pd.read_excel(xlsx_path)
-        xlsx_players = set(df_xlsx['Licence ID'].astype(str).str.strip())
-        
-        missing_in_xlsx = csv_players - xlsx_players
-        
-        print(f"[{cat}] CSV players: {len(csv_players)} | Extracted in XLSX: {len(xlsx_players)}")
-        if missing_in_xlsx:
-            print(f"    Missing {len(missing_in_xlsx)} players in XLSX: {missing_in_xlsx}")
-            
-            # Print names for missing players for easier debugging
-            missing_names = df_csv[df_csv['Engedélyszám'].astype(str).str.strip().isin(missing_in_xlsx)]['Név'].tolist()
-            print(f"    Names: {missing_names}")
-    except Exception as e:
-        print(f"[{cat}] Error during verification: {e}")
+if __name__ == '__main__':
+    main()